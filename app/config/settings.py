@@ -15,6 +15,14 @@ ASSETS_DIR = ROOT_DIR / "app" / "assets"
 
 # Database settings
 DB_PATH = str(ROOT_DIR / "storage/data/datastore.db")
+# Seconds between idle WAL checkpoints
+DB_MAINTENANCE_INTERVAL = 60
+# Seconds between PRAGMA optimize runs
+DB_OPTIMIZE_INTERVAL = 15 * 60
+# Seconds player state writes are coalesced for
+DB_WRITE_DELAY = 0.05
+# Prepared statements kept per connection
+DB_CACHED_STATEMENTS = 256
 
 # UI settings
 DEFAULT_WINDOW_WIDTH = 1024
@@ -27,3 +35,12 @@ DEFAULT_VOLUME = 0.5
 # Player settings
 DEFAULT_PLACEHOLDER_IMAGE = str(ASSETS_DIR / "album_placeholder.png")
 DEFAULT_BATCH_SIZE = 100
+DEFAULT_COVER_CACHE_SIZE = 128
+# Scanned files whose tags are kept in memory
+DEFAULT_METADATA_CACHE_SIZE = 20000
+# Tracks kept in the played history
+MAX_PLAYED_HISTORY = 500
+# Milliseconds of playback between position callbacks
+POSITION_NOTIFY_INTERVAL = 250
+# Seconds between saves of the playback position
+POSITION_SAVE_INTERVAL = 2
@@ -1,15 +1,20 @@
 """
 Music track data model
 """
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Dict, Optional, Any
 
 from app.config.settings import DEFAULT_DURATION_TEXT
 
 
-@dataclass
+@dataclass(slots=True)
 class Music:
-    """Music track data model"""
+    """
+    Music track data model
+
+    Libraries hold tens of thousands of tracks, so instances use slots
+    instead of a per-instance __dict__.
+    """
     title: str
     artist: str
     album: str
@@ -20,9 +25,24 @@ class Music:
     year: Optional[int] = None
     genre: Optional[str] = None
     folder: Optional[str] = None
+    # Dictionary returned by to_dict(), built on first call
+    _dict: Optional[Dict[str, Any]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     def to_dict(self) -> Dict[str, Any]:
-        """Convert the model to a dictionary"""
+        """
+        Convert the model to a dictionary
+
+        Tracks are not modified once created, so the dictionary is built
+        once and shared by every caller, which must not mutate it.
+        """
+        if self._dict is None:
+            self._dict = self._build_dict()
+        return self._dict
+
+    def _build_dict(self) -> Dict[str, Any]:
+        """Build the dictionary returned by to_dict()"""
         return {
             "title": self.title,
             "artist": self.artist,
@@ -51,3 +71,30 @@ class Music:
             year=data.get("year"),
             genre=data.get("genre")
         )
+
+    @classmethod
+    def from_metadata(cls, metadata: Dict[str, Any], folder: str) -> 'Music':
+        """
+        Create a Music instance from the tag metadata of a scanned file
+
+        Args:
+            metadata (Dict[str, Any]): Metadata from
+                MetadataService.load_music_metadata
+            folder (str): The scanned folder the file belongs to
+
+        Returns:
+            Music: The music track
+        """
+        get = metadata.get
+        return cls(
+            get("title", "Titulo desconhecido"),
+            get("artist", "Artista desconhecido"),
+            get("album", "Álbum desconhecido"),
+            get("album_artist", "Artista desconhecido"),
+            metadata["filename"],
+            get("duration", DEFAULT_DURATION_TEXT),
+            get("track"),
+            get("year"),
+            get("genre"),
+            folder
+        )
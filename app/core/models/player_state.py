@@ -1,12 +1,37 @@
 """
 Player state data model
 """
+import logging
+import random
+from bisect import bisect_left, bisect_right
+from collections import deque
 from dataclasses import dataclass, field
-import json
-from typing import Dict, List, Optional, Any
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
 
+from app.config.settings import MAX_PLAYED_HISTORY
+from app.utils.json_utils import json_dumps, json_loads, JSONDecodeError
 
-@dataclass
+logger = logging.getLogger(__name__)
+
+# (column, attribute, default) of flags stored as "True"/"False" text
+_BOOL_FIELDS = (
+    ("is_pause", "is_paused", "True"),
+    ("is_muted", "is_muted", "False"),
+    ("is_playing", "is_playing", "False"),
+    ("is_shuffle", "is_shuffle", "False"),
+)
+
+# (column, attribute) of values stored as they are
+_PLAIN_FIELDS = (
+    ("volume", "volume"),
+    ("audio_duration", "audio_duration"),
+    ("audio_current_position", "audio_position"),
+    ("current_album", "current_album"),
+    ("playlist_source", "playlist_source"),
+)
+
+
+@dataclass(slots=True)
 class PlayerState:
     """Player state data model"""
     is_paused: bool = True
@@ -21,47 +46,312 @@ class PlayerState:
     current_album: Optional[str] = None
     playlist: List[Dict[str, Any]] = field(default_factory=list)
     playlist_source: str = "all"  # "all" for all songs, "album" for specific album
-    played_music: List[Dict[str, Any]] = field(default_factory=list)
+    # Most recent MAX_PLAYED_HISTORY tracks, the oldest are dropped first
+    played_music: Deque[Dict[str, Any]] = field(
+        default_factory=lambda: deque(maxlen=MAX_PLAYED_HISTORY)
+    )
+
+    # Filename -> sequence number in played_music, kept in sync by the played
+    # history helpers
+    _played_index: Dict[str, int] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    # Sequence number of played_music[0], grows as old entries are dropped
+    _played_offset: int = field(
+        default=0, init=False, repr=False, compare=False
+    )
+    # JSON of each played_music filename, built on first save and then
+    # appended to
+    _played_json: Optional[Deque[str]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    # JSON array of the played_music filenames from the last save, reset by
+    # the played history helpers
+    _played_music_array: Optional[str] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    # Filename -> position in playlist, built on first lookup and reset by the
+    # playlist helpers
+    _playlist_index: Optional[Dict[str, int]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    # Playlist filenames in sorted order, built on first neighbour lookup and
+    # reset by the playlist helpers
+    _playlist_sorted: Optional[List[str]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    # Shuffled playlist positions walked by next_unplayed(), reset with the
+    # playlist or played history
+    _shuffle_order: Optional[List[int]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    # Position in _shuffle_order before which every track was already played
+    _shuffle_cursor: int = field(
+        default=0, init=False, repr=False, compare=False
+    )
+    # JSON of the playlist from the last save, reset by the playlist helpers
+    _playlist_json: Optional[str] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    # (current_music, its JSON) from the last save, reused while the same dict
+    # is current
+    _current_music_json: Optional[Tuple[Dict[str, Any], Optional[str]]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self):
+        self.played_music = deque(self.played_music, maxlen=MAX_PLAYED_HISTORY)
+        self._index_played()
+
+    def _index_played(self) -> None:
+        """Rebuild the played history index, keeping each first position"""
+        self._played_index = {}
+        self._played_offset = 0
+        for position, music in enumerate(self.played_music):
+            self._played_index.setdefault(music.get("filename"), position)
+
+    def played_index(self, filename: Optional[str]) -> Optional[int]:
+        """Get a track's position in the played history, or None"""
+        sequence = self._played_index.get(filename)
+        return None if sequence is None else sequence - self._played_offset
+
+    def add_played(self, music: Dict[str, Any]) -> None:
+        """Append a track to the played history if it is not already there"""
+        filename = music.get("filename")
+        if filename in self._played_index:
+            return
+
+        sequence = self._played_offset + len(self.played_music)
+        self._played_index[filename] = sequence
+
+        # A full history drops its oldest entry on append, forget it first
+        if len(self.played_music) == self.played_music.maxlen:
+            evicted = self.played_music[0].get("filename")
+            if self._played_index.get(evicted) == self._played_offset:
+                del self._played_index[evicted]
+            self._played_offset += 1
+
+        # _played_json has the same maxlen, so it drops the same entry
+        self.played_music.append(music)
+        self._played_music_array = None
+
+        if self._played_json is not None:
+            self._played_json.append(json_dumps(filename))
+
+    def reset_played(self, musics: Iterable[Dict[str, Any]] = ()) -> None:
+        """Replace the played history, clearing it by default"""
+        self.played_music = deque(musics, maxlen=MAX_PLAYED_HISTORY)
+        self._index_played()
+        self._played_json = None
+        self._played_music_array = None
+        self._shuffle_order = None
+
+    def set_playlist(
+        self,
+        musics: Iterable[Dict[str, Any]],
+        source: Optional[str] = None
+    ) -> None:
+        """Replace the playlist, optionally changing where it came from"""
+        self.playlist = list(musics)
+        self._playlist_index = None
+        self._playlist_sorted = None
+        self._playlist_json = None
+        self._shuffle_order = None
+        if source is not None:
+            self.playlist_source = source
+
+    def extend_playlist(self, musics: Iterable[Dict[str, Any]]) -> None:
+        """Append tracks to the end of the playlist"""
+        start = len(self.playlist)
+        self.playlist.extend(musics)
+        self._playlist_json = None
+        self._playlist_sorted = None
+        self._shuffle_order = None
+
+        if self._playlist_index is not None:
+            for index in range(start, len(self.playlist)):
+                filename = self.playlist[index].get("filename")
+                self._playlist_index.setdefault(filename, index)
+
+    def _get_playlist_index(self) -> Dict[str, int]:
+        """Get the filename -> playlist position map, building it if needed"""
+        index = self._playlist_index
+        if index is None:
+            index = {}
+            for position, music in enumerate(self.playlist):
+                index.setdefault(music.get("filename"), position)
+            self._playlist_index = index
+        return index
+
+    def playlist_index(self, filename: Optional[str]) -> Optional[int]:
+        """Get a track's position in the playlist, or None"""
+        return self._get_playlist_index().get(filename)
+
+    def playlist_neighbour(
+        self,
+        filename: str,
+        is_next: bool
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get the playlist track that comes right after or before a filename
+        alphabetically
+
+        Used when the current track is no longer in the playlist, so
+        playback continues from where it would have been.
+
+        Args:
+            filename (str): The filename to start from, it does not need to be
+                in the playlist
+            is_next (bool): True for the following track, False for the
+                preceding one
+
+        Returns:
+            Optional[Dict[str, Any]]: The track, wrapping around to the first
+                or last playlist track, or None if the playlist is empty
+        """
+        if not self.playlist:
+            return None
+
+        index = self._get_playlist_index()
+        names = self._playlist_sorted
+        if names is None:
+            names = sorted(name for name in index if name is not None)
+            self._playlist_sorted = names
+
+        if is_next:
+            position = bisect_right(names, filename)
+            if position < len(names):
+                return self.playlist[index[names[position]]]
+            return self.playlist[0]
+
+        position = bisect_left(names, filename)
+        if position > 0:
+            return self.playlist[index[names[position - 1]]]
+        return self.playlist[-1]
+
+    def next_unplayed(self) -> Optional[Dict[str, Any]]:
+        """
+        Get a random playlist track that is not in the played history
+
+        The playlist order is shuffled once and then walked, so picking the
+        next track costs amortized O(1) instead of a scan of the playlist.
+
+        Returns:
+            Optional[Dict[str, Any]]: The track, or None if every track was
+                played
+        """
+        order = self._shuffle_order
+        if order is None:
+            order = random.sample(range(len(self.playlist)), len(self.playlist))
+            self._shuffle_order = order
+            self._shuffle_cursor = 0
+
+        # Skip tracks played since the order was shuffled, they stay played
+        # until reset_played() shuffles a new order
+        while self._shuffle_cursor < len(order):
+            music = self.playlist[order[self._shuffle_cursor]]
+            if music.get("filename") not in self._played_index:
+                return music
+            self._shuffle_cursor += 1
+
+        return None
+
+    def _current_music_to_json(self) -> Optional[str]:
+        """Serialize current_music, reused while the same track is current"""
+        cached = self._current_music_json
+        if cached is not None and cached[0] is self.current_music:
+            return cached[1]
+
+        value = self._safe_json_dumps(self.current_music)
+        if self.current_music is not None:
+            self._current_music_json = (self.current_music, value)
+        return value
+
+    def _playlist_to_json(self) -> Optional[str]:
+        """Serialize the playlist filenames, reusing the unchanged result"""
+        if self._playlist_json is None:
+            self._playlist_json = self._safe_json_dumps(
+                [music.get("filename") for music in self.playlist]
+            )
+        return self._playlist_json
+
+    def _played_music_json(self) -> Optional[str]:
+        """Serialize played_music filenames, reusing the unchanged result"""
+        if self._played_music_array is not None:
+            return self._played_music_array
+
+        # Only the tracks played since the last save are serialized again
+        if self._played_json is None:
+            self._played_json = deque(
+                (
+                    json_dumps(music.get("filename"))
+                    for music in self.played_music
+                ),
+                maxlen=MAX_PLAYED_HISTORY
+            )
+
+        self._played_music_array = "[" + ",".join(self._played_json) + "]"
+        return self._played_music_array
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert the model to a dictionary for database storage"""
-        return {
-            "is_pause": str(self.is_paused),
-            "is_muted": str(self.is_muted),
-            "is_playing": str(self.is_playing),
-            "is_shuffle": str(self.is_shuffle),
-            "is_repeat": str(self.is_repeat) if self.is_repeat else "False",
-            "volume": self.volume,
-            "audio_duration": self.audio_duration,
-            "audio_current_position": self.audio_position,
-            "current_music": self._safe_json_dumps(self.current_music),
-            "current_album": self.current_album,
-            "playlist": self._safe_json_dumps(self.playlist),
-            "playlist_source": self.playlist_source,
-            "played_music": self._safe_json_dumps(self.played_music),
+        data = {
+            column: str(getattr(self, attr)) for column, attr, _ in _BOOL_FIELDS
         }
+        data["is_repeat"] = str(self.is_repeat) if self.is_repeat else "False"
+
+        for column, attr in _PLAIN_FIELDS:
+            data[column] = getattr(self, attr)
+
+        # current_music is replaced, never mutated, when the track changes
+        data["current_music"] = self._current_music_to_json()
+
+        # Track lists are stored as filenames and resolved from the library on
+        # load. The playlist rarely changes between saves, reuse its JSON
+        data["playlist"] = self._playlist_to_json()
+
+        # The played history only grows between saves, serialize it
+        # incrementally
+        data["played_music"] = self._played_music_json()
+
+        return data
 
     def _safe_json_dumps(self, obj: Any) -> Optional[str]:
         """Safely convert an object to a JSON string"""
         if obj is None:
             return None
         try:
-            return json.dumps(obj)
+            return json_dumps(obj)
         except (TypeError, ValueError):
-            print(f"Warning: Failed to serialize object: {type(obj)}")
+            logger.warning("Failed to serialize object: %s", type(obj))
             return None
 
     @classmethod
-    def from_dict(cls, data: Dict[str, Any]) -> 'PlayerState':
-        """Create a PlayerState instance from a dictionary"""
+    def from_dict(
+        cls,
+        data: Dict[str, Any],
+        playlist: Optional[List[Dict[str, Any]]] = None,
+        resolve: Optional[Callable[[str], Optional[Dict[str, Any]]]] = None
+    ) -> 'PlayerState':
+        """
+        Create a PlayerState instance from a dictionary
+
+        Args:
+            data (Dict[str, Any]): The stored player state
+            playlist (Optional[List[Dict[str, Any]]]): Already loaded playlist,
+                used instead of parsing the stored playlist JSON
+            resolve (Optional[Callable[[str], Optional[Dict[str, Any]]]]):
+                Gets the track of a stored filename, tracks it can't find are
+                dropped
+        """
         if not data:
             return cls()
 
         # Convert string representations to actual booleans
-        is_paused = cls._parse_bool(data.get("is_pause", "True"))
-        is_muted = cls._parse_bool(data.get("is_muted", "False"))
-        is_playing = cls._parse_bool(data.get("is_playing", "False"))
-        is_shuffle = cls._parse_bool(data.get("is_shuffle", "False"))
+        flags = {
+            attr: cls._parse_bool(data.get(column, default))
+            for column, attr, default in _BOOL_FIELDS
+        }
 
         # Handle repeat state
         repeat_value = data.get("is_repeat")
@@ -71,8 +361,9 @@ class PlayerState:
 
         # Handle complex JSON fields
         current_music = cls._safe_json_loads(data.get("current_music"))
-        playlist = cls._safe_json_loads(data.get("playlist")) or []
-        played_music = cls._safe_json_loads(data.get("played_music")) or []
+        if playlist is None:
+            playlist = cls._parse_tracks(data.get("playlist"), resolve)
+        played_music = cls._parse_tracks(data.get("played_music"), resolve)
 
         # Handle numeric fields
         volume = cls._parse_float(data.get("volume", "0.5"))
@@ -80,10 +371,7 @@ class PlayerState:
         audio_position = cls._parse_int(data.get("audio_current_position"))
 
         return cls(
-            is_paused=is_paused,
-            is_muted=is_muted,
-            is_playing=is_playing,
-            is_shuffle=is_shuffle,
+            **flags,
             is_repeat=is_repeat,
             volume=volume,
             audio_duration=audio_duration,
@@ -95,6 +383,24 @@ class PlayerState:
             played_music=played_music
         )
 
+    @classmethod
+    def _parse_tracks(
+        cls,
+        value: Any,
+        resolve: Optional[Callable[[str], Optional[Dict[str, Any]]]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Parse a stored track list of filenames, or of full tracks as saved by
+        older versions
+        """
+        tracks = []
+        for entry in cls._safe_json_loads(value) or []:
+            if isinstance(entry, str):
+                entry = resolve(entry) if resolve else None
+            if entry:
+                tracks.append(entry)
+        return tracks
+
     @staticmethod
     def _parse_bool(value: Any) -> bool:
         """Safely parse a boolean value from various input types"""
@@ -129,7 +435,7 @@ class PlayerState:
         if not value:
             return None
         try:
-            return json.loads(value)
-        except (json.JSONDecodeError, TypeError):
-            print(f"Warning: Failed to deserialize value: {value[:20]}...")
+            return json_loads(value)
+        except (JSONDecodeError, TypeError):
+            logger.warning("Failed to deserialize value: %.20s...", value)
             return None
@@ -3,7 +3,7 @@ Thread-safe cache manager for repository data
 """
 import time
 import threading
-from typing import Optional, TypeVar, Generic, Callable
+from typing import Optional, Tuple, TypeVar, Generic, Callable
 
 T = TypeVar('T')
 
@@ -13,20 +13,39 @@ class CacheManager(Generic[T]):
     A thread-safe caching manager for repositories.
 
     Provides synchronized access to cached data with timeout-based invalidation.
+    The cached value and its timestamp are kept in a single tuple that is
+    swapped atomically, so reads of a valid cache never take the lock.
     """
 
-    def __init__(self, timeout_seconds: int = 10):
+    def __init__(self, timeout_seconds: Optional[int] = 10):
         """
         Initialize the cache manager.
 
         Args:
-            timeout_seconds (int): Cache timeout in seconds
+            timeout_seconds (Optional[int]): Cache timeout in seconds, None to
+                keep the data until it is invalidated
         """
-        self._data: Optional[T] = None
-        self._timestamp: float = 0
-        self._timeout: int = timeout_seconds
+        self._entry: Tuple[Optional[T], float] = (None, 0)
+        self._timeout: Optional[int] = timeout_seconds
         self._lock = threading.RLock()
 
+    def _is_fresh(self, entry: Tuple[Optional[T], float]) -> bool:
+        """
+        Check if a cache entry is still valid based on timeout.
+
+        Args:
+            entry (Tuple[Optional[T], float]): The (data, timestamp) pair
+
+        Returns:
+            bool: True if the entry is valid, False otherwise
+        """
+        data, timestamp = entry
+        if data is None:
+            return False
+        if self._timeout is None:
+            return True
+        return (time.time() - timestamp) < self._timeout
+
     def get(self, loader: Callable[[], T]) -> T:
         """
         Get data from cache or load it if cache is invalid.
@@ -37,14 +56,21 @@ class CacheManager(Generic[T]):
         Returns:
             T: Cached or freshly loaded data
         """
+        # Lock-free fast path
+        entry = self._entry
+        if self._is_fresh(entry):
+            return entry[0]
+
         with self._lock:
-            if self.is_valid():
-                return self._data
+            # Another thread may have reloaded while we waited for the lock
+            entry = self._entry
+            if self._is_fresh(entry):
+                return entry[0]
 
             # Cache invalid, reload data
-            self._data = loader()
-            self._timestamp = time.time()
-            return self._data
+            data = loader()
+            self._entry = (data, time.time())
+            return data
 
     def is_valid(self) -> bool:
         """
@@ -53,14 +79,22 @@ class CacheManager(Generic[T]):
         Returns:
             bool: True if cache is valid, False otherwise
         """
-        return (self._data is not None and
-                (time.time() - self._timestamp) < self._timeout)
+        return self._is_fresh(self._entry)
+
+    def peek(self) -> Optional[T]:
+        """
+        Get the cached data without loading it.
+
+        Returns:
+            Optional[T]: The cached data or None if the cache is invalid
+        """
+        entry = self._entry
+        return entry[0] if self._is_fresh(entry) else None
 
     def invalidate(self) -> None:
         """Invalidate the cache."""
         with self._lock:
-            self._data = None
-            self._timestamp = 0
+            self._entry = (None, 0)
 
     def set(self, data: T) -> None:
         """
@@ -70,8 +104,7 @@ class CacheManager(Generic[T]):
             data (T): Data to cache
         """
         with self._lock:
-            self._data = data
-            self._timestamp = time.time()
+            self._entry = (data, time.time())
 
     def update(self, update_func: Callable[[T], T]) -> Optional[T]:
         """
@@ -84,9 +117,10 @@ class CacheManager(Generic[T]):
             Optional[T]: Updated data or None if cache was invalid
         """
         with self._lock:
-            if not self.is_valid():
+            entry = self._entry
+            if not self._is_fresh(entry):
                 return None
 
-            self._data = update_func(self._data)
-            self._timestamp = time.time()
-            return self._data
+            data = update_func(entry[0])
+            self._entry = (data, time.time())
+            return data
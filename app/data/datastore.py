@@ -2,13 +2,14 @@
 Database abstraction layer for SQLite operations
 """
 import os
+import atexit
 import threading
 import queue
 from sqlite3 import connect, Error, Row, Connection
 from typing import Dict, List, Any, Optional, Tuple, Union, ContextManager
 from contextlib import contextmanager
 
-from app.config.settings import DB_PATH
+from app.config.settings import DB_CACHED_STATEMENTS, DB_PATH
 
 
 class ConnectionPool:
@@ -39,6 +40,10 @@ class ConnectionPool:
         # Ensure database directory exists
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
 
+        # Connections live for the whole session, close them cleanly on exit
+        # so SQLite checkpoints the WAL back into the database file
+        atexit.register(self.close_all)
+
     def get_connection(self) -> Connection:
         """
         Get a connection from the pool or create a new one if needed.
@@ -71,11 +76,11 @@ class ConnectionPool:
         Args:
             connection (Connection): The connection to return
         """
-        # Test if connection is valid before returning to pool
+        # Connections stay open for the whole session, only make sure no
+        # half finished transaction leaks into the next borrower
         try:
-            cursor = connection.cursor()
-            cursor.execute("SELECT 1")
-            cursor.close()
+            if connection.in_transaction:
+                connection.rollback()
             self.pool.put(connection, block=False)
         except (Error, queue.Full):
             # If connection is invalid or pool is full, close it
@@ -88,12 +93,29 @@ class ConnectionPool:
         Returns:
             Connection: A new SQLite connection
         """
-        conn = connect(database=self.db_path, check_same_thread=False)
+        # Queries are parameterized, so a larger statement cache lets every
+        # repository's lookups reuse their prepared statements
+        conn = connect(
+            database=self.db_path,
+            check_same_thread=False,
+            cached_statements=DB_CACHED_STATEMENTS
+        )
         conn.row_factory = Row
         # Enable foreign keys
         conn.execute("PRAGMA foreign_keys = ON")
         # Set busy timeout to prevent "database is locked" errors
         conn.execute("PRAGMA busy_timeout = 5000")
+        # WAL lets readers run alongside the writer and, with synchronous
+        # NORMAL, commits no longer wait for an fsync of the main database
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        # Keep temporary tables and indices in memory, with up to a ~64 MB
+        # page cache, which only grows as pages are read so small libraries
+        # don't pay for it
+        conn.execute("PRAGMA temp_store = MEMORY")
+        conn.execute("PRAGMA cache_size = -64000")
+        # Read pages through a 256 MB memory map instead of read() calls
+        conn.execute("PRAGMA mmap_size = 268435456")
         return conn
 
     def _close_connection(self, connection: Connection) -> None:
@@ -129,6 +151,11 @@ class Datastore:
     Database abstraction layer for SQLite operations.
     Provides a simple interface for CRUD operations on SQLite database.
     """
+    # (database, table or index) already created by this process, shared by
+    # every instance so repositories created per view skip the schema queries
+    _initialized_schema = set()
+    _schema_lock = threading.Lock()
+
     def __init__(self, table: str):
         """
         Initialize datastore with a specific table name.
@@ -205,11 +232,40 @@ class Datastore:
         Args:
             columns (Dict[str, str]): Dictionary of column names and their types
         """
+        key = (self.db_path, self.table)
+        if key in Datastore._initialized_schema:
+            return
+
         columns_str = ', '.join([f'{column} {type}' for column, type in columns.items()])
 
-        self.execute_query(
-            f'''CREATE TABLE IF NOT EXISTS {self.table} ({columns_str})'''
-        )
+        with Datastore._schema_lock:
+            self.execute_query(
+                f'''CREATE TABLE IF NOT EXISTS {self.table} ({columns_str})'''
+            )
+            Datastore._initialized_schema.add(key)
+
+    def create_index(self, columns: List[str], unique: bool = False) -> None:
+        """
+        Create an index on the table if it doesn't exist.
+
+        Args:
+            columns (List[str]): Columns covered by the index, in order
+            unique (bool): Whether the indexed values must be unique
+        """
+        name = f"idx_{self.table}_{'_'.join(columns)}"
+        key = (self.db_path, name)
+        if key in Datastore._initialized_schema:
+            return
+
+        kind = 'UNIQUE INDEX' if unique else 'INDEX'
+        indexed = ', '.join(columns)
+
+        with Datastore._schema_lock:
+            self.execute_query(
+                f'CREATE {kind} IF NOT EXISTS {name} '
+                f'ON {self.table} ({indexed})'
+            )
+            Datastore._initialized_schema.add(key)
 
     def save(self, data: Dict[str, Any]) -> int:
         """
@@ -230,6 +286,47 @@ class Datastore:
         )
         return cursor.lastrowid
 
+    def save_many(
+        self,
+        rows: List[Dict[str, Any]],
+        conflict_columns: Optional[List[str]] = None
+    ) -> int:
+        """
+        Insert multiple records into the table in a single transaction.
+
+        Args:
+            rows (List[Dict[str, Any]]): Records to insert, all with the same
+                columns
+            conflict_columns (Optional[List[str]]): Unique columns identifying
+                existing records, which are updated instead of failing the
+                whole batch
+
+        Returns:
+            int: Number of rows inserted or updated
+        """
+        if not rows:
+            return 0
+
+        keys = list(rows[0].keys())
+        columns = ', '.join(keys)
+        placeholders = ', '.join(['?' for _ in keys])
+        query = f'INSERT INTO {self.table} ({columns}) VALUES ({placeholders})'
+
+        if conflict_columns:
+            updates = ', '.join([
+                f'{key} = excluded.{key}'
+                for key in keys if key not in conflict_columns
+            ])
+            action = f'DO UPDATE SET {updates}' if updates else 'DO NOTHING'
+            conflict = ', '.join(conflict_columns)
+            query += f' ON CONFLICT ({conflict}) {action}'
+
+        values = [tuple(row[key] for key in keys) for row in rows]
+        with self.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.executemany(query, values)
+            return cursor.rowcount
+
     def list(self, column: str = '*', condition: Optional[str] = None, params: Optional[List] = None) -> List[Dict[str, Any]]:
         """
         Retrieve records from the table.
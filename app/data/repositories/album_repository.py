@@ -1,14 +1,17 @@
 """
 Repository for album data
 """
-import json
-from typing import List
+from typing import List, Optional, Set
 
 from app.core.models import Album
 from app.data.datastore import Datastore
 from app.data.cache_manager import CacheManager
 from app.data.repositories.music_repository import MusicRepository
 from app.utils.helpers import sort_list_by
+from app.utils.json_utils import json_dumps, json_loads, JSONDecodeError
+
+# Columns read into Album objects, the id column is never used
+_ALBUM_COLUMNS = 'name, artist, year, genre, cover, tracks'
 
 
 class AlbumRepository:
@@ -33,6 +36,8 @@ class AlbumRepository:
             'cover': 'TEXT',
             'tracks': 'TEXT'
         })
+        # Albums are looked up by name and artist and deleted by name
+        self.datastore.create_index(['name', 'artist'])
 
     def _load_all_albums(self, use_cache=True) -> List[Album]:
         """
@@ -46,7 +51,7 @@ class AlbumRepository:
         """
         try:
             # Get all albums from the database
-            records = self.datastore.list()
+            records = self.datastore.list(column=_ALBUM_COLUMNS)
             albums = []
 
             for record in records:
@@ -55,8 +60,8 @@ class AlbumRepository:
                     if 'tracks' in record and record['tracks']:
                         try:
                             # Convert the stored JSON string back to a list of track dictionaries
-                            record['tracks'] = json.loads(record['tracks'])
-                        except json.JSONDecodeError as json_err:
+                            record['tracks'] = json_loads(record['tracks'])
+                        except JSONDecodeError as json_err:
                             print(f"Error decoding JSON for album {record.get('name')}: {json_err}")
                             record['tracks'] = []
                     else:
@@ -92,6 +97,47 @@ class AlbumRepository:
         albums = self._cache_manager.get(lambda: self._load_all_albums(use_cache=use_cache))
         return sort_list_by(key=sort_by, list=albums.copy() if albums else [])
 
+    def get_album_cover(self, name: str, artist: str) -> Optional[str]:
+        """
+        Get the stored cover of an album
+
+        Args:
+            name (str): The album name
+            artist (str): The album artist
+
+        Returns:
+            Optional[str]: Album cover image as base64, or None if not stored
+        """
+        try:
+            record = self.datastore.get_single(
+                column='cover',
+                condition="name = ? AND artist = ?",
+                params=[name, artist]
+            )
+            return record['cover'] if record and record['cover'] else None
+        except Exception as err:
+            print(f"Error getting album cover: {err}")
+            return None
+
+    def get_album_keys_with_cover(self) -> Set[str]:
+        """
+        Get the name:artist keys of the albums that already have a cover
+
+        Returns:
+            Set[str]: Keys of the albums with a stored cover
+        """
+        try:
+            records = self.datastore.list(
+                column='name, artist',
+                condition="cover IS NOT NULL AND cover != ''"
+            )
+            return {
+                f"{record['name']}:{record['artist']}" for record in records
+            }
+        except Exception as err:
+            print(f"Error getting albums with cover: {err}")
+            return set()
+
     def batch_save_albums(self, albums_list: List[Album]) -> bool:
         """
         Save multiple albums in a single transaction, updating existing ones if needed.
@@ -127,7 +173,16 @@ class AlbumRepository:
                     params.extend([name, artist])
 
                 condition_str = " OR ".join(conditions) if conditions else ""
-                existing_records = self.datastore.list(condition=condition_str, params=params) if condition_str else []
+                # Only whether a cover is stored matters here, not the base64
+                # data
+                existing_records = self.datastore.list(
+                    column=(
+                        "name, artist, year, genre, tracks, "
+                        "(cover IS NOT NULL AND cover != '') AS has_cover"
+                    ),
+                    condition=condition_str,
+                    params=params
+                ) if condition_str else []
 
                 # Create a lookup dictionary of existing records
                 existing_dict = {f"{record['name']}:{record['artist']}": record
@@ -148,7 +203,7 @@ class AlbumRepository:
                             'year': album.year,
                             'genre': album.genre,
                             'cover': album.cover,
-                            'tracks': json.dumps(track_dicts)
+                            'tracks': json_dumps(track_dicts)
                         })
                     else:
                         # Existing album - merge tracks
@@ -157,8 +212,8 @@ class AlbumRepository:
 
                         try:
                             if record.get('tracks'):
-                                existing_tracks = json.loads(record['tracks'])
-                        except (json.JSONDecodeError, TypeError):
+                                existing_tracks = json_loads(record['tracks'])
+                        except (JSONDecodeError, TypeError):
                             pass
 
                         # Fast lookup for existing filenames
@@ -174,14 +229,14 @@ class AlbumRepository:
                         # Only update if we added tracks or need to update other fields
                         update_data = {}
                         if added:
-                            update_data['tracks'] = json.dumps(existing_tracks)
+                            update_data['tracks'] = json_dumps(existing_tracks)
 
                         # Update other fields only if needed
                         if not record.get('year') and album.year:
                             update_data['year'] = album.year
                         if not record.get('genre') and album.genre:
                             update_data['genre'] = album.genre
-                        if not record.get('cover') and album.cover:
+                        if not record.get('has_cover') and album.cover:
                             update_data['cover'] = album.cover
 
                         if update_data:
@@ -191,25 +246,33 @@ class AlbumRepository:
             with self.datastore.transaction() as conn:
                 cursor = conn.cursor()
 
-                # Insert new albums
+                # Insert new albums, they all share the same columns
                 if inserts:
-                    for data in inserts:
-                        columns = ', '.join(data.keys())
-                        placeholders = ', '.join(['?' for _ in data])
-                        cursor.execute(
-                            f'INSERT INTO {self.datastore.table} ({columns}) VALUES ({placeholders})',
-                            tuple(data.values())
-                        )
-
-                # Update existing albums
+                    columns = ', '.join(inserts[0].keys())
+                    placeholders = ', '.join(['?' for _ in inserts[0]])
+                    cursor.executemany(
+                        f'INSERT INTO {self.datastore.table} ({columns}) '
+                        f'VALUES ({placeholders})',
+                        [tuple(data.values()) for data in inserts]
+                    )
+
+                # Update existing albums, one statement per distinct set of
+                # changed columns
                 if updates:
+                    grouped_updates = {}
                     for update_data, name, artist in updates:
-                        set_clause = ', '.join([f"{k} = ?" for k in update_data.keys()])
-                        cursor.execute(
-                            f'UPDATE {self.datastore.table} SET {set_clause} WHERE name = ? AND artist = ?',
+                        keys = tuple(update_data.keys())
+                        grouped_updates.setdefault(keys, []).append(
                             tuple(update_data.values()) + (name, artist)
                         )
 
+                    for keys, params in grouped_updates.items():
+                        set_clause = ', '.join([f"{k} = ?" for k in keys])
+                        cursor.executemany(
+                            f'UPDATE {self.datastore.table} SET {set_clause} WHERE name = ? AND artist = ?',
+                            params
+                        )
+
             # Invalidate cache to ensure fresh data
             self._cache_manager.invalidate()
             return True
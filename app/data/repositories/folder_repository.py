@@ -129,8 +129,11 @@ class FolderRepository:
                 folders = self._cache_manager.get(lambda: [])
                 return any(folder.path == path for folder in folders)
 
-            # Not in cache or cache invalid, query database
-            record = self.datastore.get_single(condition="path = ?", params=[path])
+            # Not in cache or cache invalid, query database, the unique path
+            # is indexed
+            record = self.datastore.get_single(
+                column='id', condition="path = ?", params=[path]
+            )
             return record is not None
         except Exception as err:
             print(f"Error checking if folder exists: {err}")
@@ -1,13 +1,19 @@
 """
 Repository for music tracks data
 """
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from app.core.models import Music
 from app.data.datastore import Datastore
 from app.data.cache_manager import CacheManager
 from app.utils.helpers import sort_list_by
 
+# Columns read into Music objects, the id and added_at columns are never used
+_MUSIC_COLUMNS = (
+    'title, artist, album, album_artist, filename, folder, duration, '
+    'track_number, year, genre'
+)
+
 
 class MusicRepository:
     """Repository for music tracks data"""
@@ -18,6 +24,11 @@ class MusicRepository:
         self._initialize_table()
         # Use thread-safe cache manager
         self._cache_manager = CacheManager[List[Music]](timeout_seconds=10)
+        # (cached list, filename -> music) built lazily for the list
+        # currently cached
+        self._filename_index: Optional[
+            Tuple[List[Music], Dict[str, Music]]
+        ] = None
 
     def _initialize_table(self):
         """Create the music table if it doesn't exist"""
@@ -35,6 +46,8 @@ class MusicRepository:
             'genre': 'TEXT',
             'added_at': 'TIMESTAMP DEFAULT CURRENT_TIMESTAMP',
         })
+        # Folder lookups and removals filter on this column
+        self.datastore.create_index(['folder'])
 
     def _load_all_music(self) -> List[Music]:
         """
@@ -44,12 +57,43 @@ class MusicRepository:
             List[Music]: List of all music tracks
         """
         try:
-            items = self.datastore.list()
+            items = self.datastore.list(column=_MUSIC_COLUMNS)
             return [Music.from_dict(item) for item in items]
         except Exception as err:
             print(f"Error loading all music: {err}")
             return []
 
+    def _get_filename_index(self) -> Dict[str, Music]:
+        """
+        Get a filename -> music index of the whole library
+
+        The index is rebuilt only when the cached list is replaced, so
+        repeated lookups are O(1) instead of scanning every track.
+
+        Returns:
+            Dict[str, Music]: The music tracks by filename
+        """
+        musics = self._cache_manager.get(self._load_all_music)
+        index = self._filename_index
+        if index is None or index[0] is not musics:
+            index = (musics, {music.filename: music for music in musics})
+            self._filename_index = index
+        return index[1]
+
+    def get_music_index(self) -> Dict[str, Music]:
+        """
+        Get the music tracks of the whole library by filename
+
+        Returns:
+            Dict[str, Music]: The music tracks by filename, shared with the
+                repository so it must not be modified
+        """
+        try:
+            return self._get_filename_index()
+        except Exception as err:
+            print(f"Error getting music index: {err}")
+            return {}
+
     def get_all_music(self, sort_by='title', use_cache=True) -> List[Music]:
         """
         Get all music tracks sorted by a specific key
@@ -80,13 +124,16 @@ class MusicRepository:
         try:
             # Try cache first for performance
             if self._cache_manager.is_valid():
-                musics = self._cache_manager.get(lambda: [])
-                for music in musics:
-                    if music.filename == filename:
-                        return music
+                music = self._get_filename_index().get(filename)
+                if music is not None:
+                    return music
 
             # Not in cache or cache invalid, query database
-            record = self.datastore.get_single(condition="filename = ?", params=[filename])
+            record = self.datastore.get_single(
+                column=_MUSIC_COLUMNS,
+                condition="filename = ?",
+                params=[filename]
+            )
             return Music.from_dict(record) if record else None
         except Exception as err:
             print(f"Error getting music by filename: {err}")
@@ -105,7 +152,11 @@ class MusicRepository:
         """
         try:
             # Query directly rather than filtering in memory for better performance
-            records = self.datastore.list(condition="folder = ?", params=[folder_path])
+            records = self.datastore.list(
+                column=_MUSIC_COLUMNS,
+                condition="folder = ?",
+                params=[folder_path]
+            )
             musics = [Music.from_dict(record) for record in records]
             return sort_list_by(key=sort_by, list=musics.copy() if musics else [])
         except Exception as err:
@@ -193,6 +244,34 @@ class MusicRepository:
             print(f"Error deleting music: {err}")
             return False
 
+    def delete_music_by_folder(self, folder_path: str) -> int:
+        """
+        Delete all music tracks from a specific folder path
+
+        Args:
+            folder_path (str): The folder path whose tracks are deleted
+
+        Returns:
+            int: Number of tracks deleted
+        """
+        try:
+            rows_affected = self.datastore.delete(
+                condition="folder = ?", params=[folder_path]
+            )
+
+            # Update cache if we have it
+            if self._cache_manager.is_valid():
+                def updater(musics: List[Music]) -> List[Music]:
+                    return [m for m in musics if m.folder != folder_path]
+                self._cache_manager.update(updater)
+            else:
+                self._cache_manager.invalidate()
+
+            return rows_affected
+        except Exception as err:
+            print(f"Error deleting music by folder path: {err}")
+            return 0
+
     def music_exists(self, filename: str) -> bool:
         """
         Check if a music track exists
@@ -206,20 +285,43 @@ class MusicRepository:
         try:
             # Try cache first
             if self._cache_manager.is_valid():
-                musics = self._cache_manager.get(lambda: [])
-                return any(music.filename == filename for music in musics)
+                return filename in self._get_filename_index()
 
             # Not in cache or cache invalid, query database
-            record = self.datastore.get_single(condition="filename = ?", params=[filename])
+            record = self.datastore.get_single(
+                column='filename', condition="filename = ?", params=[filename]
+            )
             return record is not None
         except Exception as err:
             print(f"Error checking if music exists: {err}")
             return False
 
+    def filter_new_music(self, music_list: List[Music]) -> List[Music]:
+        """
+        Get the music tracks that are not saved yet
+
+        Args:
+            music_list (List[Music]): List of music tracks to check
+
+        Returns:
+            List[Music]: The tracks whose filename is not in the library
+        """
+        try:
+            existing = self._get_filename_index()
+            return [
+                music for music in music_list
+                if music.filename not in existing
+            ]
+        except Exception as err:
+            print(f"Error filtering new music: {err}")
+            return list(music_list)
+
     def batch_save_music(self, music_list: List[Music]) -> bool:
         """
         Save multiple music tracks in a single transaction
 
+        Tracks already in the library are updated in place.
+
         Args:
             music_list (List[Music]): List of music tracks to save
 
@@ -230,18 +332,11 @@ class MusicRepository:
             return True
 
         try:
-            # Use transaction to ensure all or nothing
-            with self.datastore.transaction() as conn:
-                cursor = conn.cursor()
-                for music in music_list:
-                    data = music.to_dict()
-                    columns = ', '.join(data.keys())
-                    placeholders = ', '.join(['?' for _ in data])
-
-                    cursor.execute(
-                        f'INSERT INTO {self.datastore.table} ({columns}) VALUES ({placeholders})',
-                        tuple(data.values())
-                    )
+            # Single executemany upsert in one transaction, all or nothing
+            self.datastore.save_many(
+                [music.to_dict() for music in music_list],
+                conflict_columns=['filename']
+            )
 
             self._cache_manager.invalidate()
             return True
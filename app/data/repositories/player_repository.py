@@ -1,20 +1,68 @@
 """
 Repository for player state data
 """
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from app.config.settings import (
+    DB_MAINTENANCE_INTERVAL,
+    DB_OPTIMIZE_INTERVAL,
+    DB_WRITE_DELAY
+)
 from app.core.models import PlayerState
 from app.data.datastore import Datastore
 from app.data.cache_manager import CacheManager
+from app.data.repositories.music_repository import MusicRepository
+
+logger = logging.getLogger(__name__)
 
 
 class PlayerRepository:
-    """Repository for player state data"""
+    """
+    Repository for player state data.
+    Shared as a single instance so every component sees the same cached state.
+    """
+    _instance = None
+    _lock = threading.RLock()
+
+    # Idle maintenance is shared by every instance, only one timer runs
+    _maintenance_lock = threading.Lock()
+    _maintenance_timer: Optional[threading.Timer] = None
+    _maintenance_elapsed = 0
+
+    def __new__(cls):
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = super(PlayerRepository, cls).__new__(cls)
+                cls._instance._initialized = False
+            return cls._instance
 
     def __init__(self):
         """Initialize the player repository"""
+        if self._initialized:
+            return
+
         self.datastore = Datastore('player')
         self._initialize_table()
-        # Use thread-safe cache manager for player state
-        self._cache_manager = CacheManager[PlayerState](timeout_seconds=5)
+        self.music_repository = MusicRepository()
+        # Use thread-safe cache manager for player state. Every change goes
+        # through this repository, so the cached state never goes stale and
+        # is only reloaded when explicitly invalidated
+        self._cache_manager = CacheManager[PlayerState](timeout_seconds=None)
+        # Column values of the state not yet written to the database, taken on
+        # the updating thread so the write never reads a state being changed
+        self._pending_data: Optional[Dict[str, Any]] = None
+        # Writes requested within DB_WRITE_DELAY are coalesced into one
+        self._flush_lock = threading.RLock()
+        self._flush_timer: Optional[threading.Timer] = None
+        # Column values of the stored row, None until the row is known to exist
+        self._last_persisted: Optional[Dict[str, Any]] = None
+        # Bumped under _flush_lock whenever the cached state object is
+        # dropped or replaced
+        self.state_version = 0
+        self._initialized = True
+        self._start_maintenance()
 
     def _initialize_table(self):
         """Create the player table if it doesn't exist"""
@@ -44,14 +92,78 @@ class PlayerRepository:
         """
         try:
             record = self.datastore.get_single(condition="id = ?", params=[1])
-            return PlayerState.from_dict(record) if record else PlayerState()
-        except Exception as err:
-            print(f"Error loading player state: {err}")
+            if not record:
+                return PlayerState()
+
+            with self._flush_lock:
+                self._last_persisted = {
+                    k: v for k, v in record.items() if k != 'id'
+                }
+
+            return PlayerState.from_dict(
+                record,
+                playlist=self._load_library_playlist(record),
+                resolve=self._track_resolver()
+            )
+        except Exception:
+            logger.exception("Error loading player state")
             return PlayerState()
 
+    def _load_library_playlist(
+        self,
+        record: Dict[str, Any]
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Rebuild a playlist of all songs from the music library
+
+        A playlist sourced from all songs is the whole library, which the
+        music repository already loads, so the stored JSON copy is only
+        used as a fallback.
+
+        Args:
+            record (Dict[str, Any]): The stored player state
+
+        Returns:
+            Optional[List[Dict[str, Any]]]: The playlist, or None to parse the
+                stored JSON
+        """
+        if record.get('playlist_source', 'all') != 'all':
+            return None
+        if not record.get('playlist'):
+            return None
+
+        musics = self.music_repository.get_all_music()
+        if not musics:
+            return None
+
+        return [music.to_dict() for music in musics]
+
+    def _track_resolver(self) -> Callable[[str], Optional[Dict[str, Any]]]:
+        """
+        Get a function that finds the library track of a stored filename
+
+        Returns:
+            Callable[[str], Optional[Dict[str, Any]]]: Returns the track, or
+                None if it is not in the library
+        """
+        index = None
+
+        def resolve(filename: str) -> Optional[Dict[str, Any]]:
+            nonlocal index
+            # Only load the library if the stored state has tracks to resolve
+            if index is None:
+                index = self.music_repository.get_music_index()
+            music = index.get(filename)
+            return music.to_dict() if music else None
+
+        return resolve
+
     def invalidate_cache(self):
-        """Invalidate the player state cache"""
-        self._cache_manager.invalidate()
+        """Invalidate the player state cache, writing pending changes first"""
+        with self._flush_lock:
+            self.flush()
+            self._cache_manager.invalidate()
+            self.state_version += 1
 
     def get_player_state(self) -> PlayerState:
         """
@@ -60,77 +172,182 @@ class PlayerRepository:
         Returns:
             PlayerState: The current player state
         """
-        return self._cache_manager.get(self._load_player_state)
+        state = self._cache_manager.peek()
+        if state is not None:
+            return state
+
+        # Loading takes _flush_lock, take it before the cache's own lock like
+        # the updates do so the two locks are always taken in the same order
+        with self._flush_lock:
+            return self._cache_manager.get(self._load_player_state)
 
     def update_player_state(self, state: PlayerState, persist: bool = True) -> None:
         """
         Update the player state
 
+        Writes are buffered for DB_WRITE_DELAY so bursts of updates end up
+        in a single database write, use flush() to write immediately.
+
         Args:
             state (PlayerState): The player state to save
-            persist (bool): Whether to persist to database immediately
+            persist (bool): Whether to schedule a database write
                            (set to False for frequent updates like position changes)
         """
-        # Always update the cache
-        self._cache_manager.set(state)
+        data = state.to_dict()
 
-        if not persist:
-            return
+        with self._flush_lock:
+            # Always update the cache
+            if state is not self._cache_manager.peek():
+                self.state_version += 1
+            self._cache_manager.set(state)
 
-        try:
-            data = state.to_dict()
-            record = self.datastore.get_single(condition="id = ?", params=[1])
+            self._pending_data = data
 
-            if not record:
-                # No data exists, so insert new record
-                self.datastore.save(data)
-            else:
-                # Update existing record
-                self.datastore.update(data, condition='id = ?', condition_params=[1])
-        except Exception as err:
-            print(f"Error updating player state: {err}")
+            if persist and self._flush_timer is None:
+                self._flush_timer = threading.Timer(DB_WRITE_DELAY, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
 
-    def persist_cached_state(self) -> bool:
+    def flush(self) -> bool:
         """
-        Force persistence of the cached state to the database
-        Use for periodic updates or when application is closing
+        Write pending state changes to the database now
 
         Returns:
-            bool: True if state was persisted successfully, False otherwise
+            bool: True if state was written, False if nothing was pending or
+                the write failed
         """
-        if not self._cache_manager.is_valid():
-            return False
+        with self._flush_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
 
-        try:
-            state = self._cache_manager.get(lambda: None)
-            if state:
-                self.update_player_state(state, persist=True)
+            data = self._pending_data
+            if data is None:
+                return False
+
+            self._pending_data = None
+            if self._write_state(data):
                 return True
+
+            # Keep the changes for the next flush
+            self._pending_data = data
             return False
-        except Exception as err:
-            print(f"Error persisting cached state: {err}")
+
+    def _write_state(self, data: Dict[str, Any]) -> bool:
+        """
+        Write the player state to the database
+
+        Args:
+            data (Dict[str, Any]): Column values of the player state to write
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            last = self._last_persisted
+
+            if last is None:
+                record = self.datastore.get_single(
+                    column='id', condition="id = ?", params=[1]
+                )
+
+                if not record:
+                    # No data exists, so insert new record
+                    self.datastore.save(data)
+                else:
+                    # Update existing record
+                    self.datastore.update(
+                        data, condition='id = ?', condition_params=[1]
+                    )
+            else:
+                # Only write the columns that changed since the last write
+                changed = {
+                    column: value for column, value in data.items()
+                    if last.get(column) != value
+                }
+                if changed:
+                    self.datastore.update(
+                        changed, condition='id = ?', condition_params=[1]
+                    )
+
+            self._last_persisted = data
+            return True
+        except Exception:
+            logger.exception("Error updating player state")
+            # The stored row is unknown now, write every column next time
+            self._last_persisted = None
             return False
 
     def update_position(self, position: int) -> None:
         """
-        Update only the current position without persisting other state
+        Update the current position
+
+        The position goes through the same write buffer as the rest of the
+        state, so it is coalesced with other pending changes and only its
+        column is written when nothing else changed.
 
         Args:
             position (int): Current position in milliseconds
         """
         try:
-            # Update cache if valid
-            if self._cache_manager.is_valid():
-                def update_position_in_state(state: PlayerState) -> PlayerState:
-                    state.audio_position = position
-                    return state
-                self._cache_manager.update(update_position_in_state)
-
-            # Only update position in database directly
-            self.datastore.update(
-                {'audio_current_position': position},
-                condition='id = ?',
-                condition_params=[1]
-            )
-        except Exception as err:
-            print(f"Error updating position: {err}")
+            state = self.get_player_state()
+            state.audio_position = position
+            self.update_player_state(state)
+        except Exception:
+            logger.exception("Error updating position")
+
+    def _start_maintenance(self) -> None:
+        """Start the idle maintenance timer if it is not running yet"""
+        cls = type(self)
+        with cls._maintenance_lock:
+            if cls._maintenance_timer is None:
+                self._start_maintenance_locked()
+
+    def _run_maintenance(self) -> None:
+        """
+        Run idle database maintenance
+
+        Persists pending state changes, checkpoints the WAL so it does not
+        grow during long sessions and periodically lets SQLite refresh its
+        query planner statistics.
+        """
+        cls = type(self)
+
+        try:
+            self.flush()
+
+            self.datastore.execute_query('PRAGMA wal_checkpoint(PASSIVE)')
+
+            cls._maintenance_elapsed += DB_MAINTENANCE_INTERVAL
+            if cls._maintenance_elapsed >= DB_OPTIMIZE_INTERVAL:
+                cls._maintenance_elapsed = 0
+                self.datastore.execute_query('PRAGMA optimize')
+        except Exception:
+            logger.exception("Error running database maintenance")
+        finally:
+            with cls._maintenance_lock:
+                # Re-arm unless shutdown() cancelled the schedule meanwhile
+                if cls._maintenance_timer is not None:
+                    self._start_maintenance_locked()
+
+    def _start_maintenance_locked(self) -> None:
+        """Arm the next maintenance run, the caller must hold the lock"""
+        cls = type(self)
+        cls._maintenance_timer = threading.Timer(
+            DB_MAINTENANCE_INTERVAL, self._run_maintenance
+        )
+        cls._maintenance_timer.daemon = True
+        cls._maintenance_timer.start()
+
+    def shutdown(self) -> None:
+        """
+        Stop the idle maintenance timer and write any pending state
+        Use when the application is closing
+        """
+        cls = type(self)
+        with cls._maintenance_lock:
+            if cls._maintenance_timer is not None:
+                cls._maintenance_timer.cancel()
+                cls._maintenance_timer = None
+
+        self.flush()
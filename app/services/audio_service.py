@@ -1,16 +1,23 @@
 """
 Audio service for handling audio playback and control
 """
-from random import choice
+import logging
+import time
 from typing import Dict, Optional, Any, Callable
 
 from flet import Page
 from flet_audio import Audio, AudioState, AudioStateChangeEvent
 
-from app.config.settings import DEFAULT_VOLUME
+from app.config.settings import (
+    DEFAULT_VOLUME,
+    POSITION_NOTIFY_INTERVAL,
+    POSITION_SAVE_INTERVAL
+)
 from app.core.models import PlayerState, Music
 from app.data.repositories import PlayerRepository, MusicRepository
 
+logger = logging.getLogger(__name__)
+
 
 class AudioService:
     """Service for audio playback and control"""
@@ -36,7 +43,17 @@ class AudioService:
             on_position_changed=self._on_audio_position_changed,
         )
         self.audio._initial_load = False  # Custom attribute to track initial loading
-        self._position_update_counter = 0
+        # When the position was last saved
+        self._last_position_save = time.monotonic()
+        # Position sent to the last callbacks
+        self._last_notified_position = -POSITION_NOTIFY_INTERVAL
+        # Duration of the loaded track, in milliseconds
+        self._duration: Optional[int] = None
+        # Last (state, filename) sent on play:music
+        self._last_published: Optional[tuple] = None
+        # Player state object and the repository state_version it was read at
+        self._cached_state: Optional[PlayerState] = None
+        self._state_version: int = -1
 
         # Add audio player to page overlay
         self.page.overlay.append(self.audio)
@@ -44,14 +61,31 @@ class AudioService:
         # Load initial player state
         self._load_player_state()
 
-        # Event callbacks
-        self._on_position_changed_callbacks = []
-        self._on_state_changed_callbacks = []
-        self._on_music_changed_callbacks = []
+        # Event callbacks, tuples rebound on registration so events can
+        # iterate them while another callback is being registered
+        self._on_position_changed_callbacks = ()
+        self._on_state_changed_callbacks = ()
+        self._on_music_changed_callbacks = ()
+
+    @property
+    def _state(self) -> PlayerState:
+        """
+        The shared player state, read from the repository only when it was
+        replaced
+
+        The repository mutates and returns a single state object, so it is
+        kept here and looked up again only after the repository bumps its
+        state_version.
+        """
+        version = self.player_repository.state_version
+        if version != self._state_version or self._cached_state is None:
+            self._cached_state = self.player_repository.get_player_state()
+            self._state_version = version
+        return self._cached_state
 
     def _load_player_state(self) -> None:
         """Load the player state from the repository"""
-        state = self.player_repository.get_player_state()
+        state = self._state
 
         # Set volume
         self.audio.volume = state.volume if not state.is_muted else 0
@@ -69,22 +103,76 @@ class AudioService:
         Args:
             music (Music): The music track to load
         """
+        self._load_track(music.to_dict(), music)
+
+    def load_music_from_dict(self, music_data: Dict[str, Any]) -> None:
+        """
+        Load a music track stored as a dictionary, like playlist entries
+
+        The Music object is only built if a music changed callback needs it.
+
+        Args:
+            music_data (Dict[str, Any]): The music track to load
+        """
+        self._load_track(music_data)
+
+    def _load_track(
+        self,
+        music_data: Dict[str, Any],
+        music: Optional[Music] = None
+    ) -> None:
+        """
+        Load a music track into the audio player
+
+        Args:
+            music_data (Dict[str, Any]): The track as stored in the player state
+            music (Optional[Music]): The same track as a model, built from
+                music_data if needed
+        """
         # Update current music in state
-        state = self.player_repository.get_player_state()
+        state = self._state
 
-        state.current_music = music.to_dict()
-        state.current_album = music.album
+        state.current_music = music_data
+        state.current_album = music_data.get('album')
 
-        # Add to played music list if not already there
-        if music.to_dict() not in state.played_music:
-            state.played_music.append(music.to_dict())
+        # Add to played music list if not already there, neither is mutated
+        # so both can share the same dict
+        state.add_played(music_data)
 
         # Set audio source and play
-        self.audio.src = music.filename
+        self.audio.src = music_data.get('filename')
+        self._duration = None
+        self._last_notified_position = -POSITION_NOTIFY_INTERVAL
+        # A track loaded again, like on repeat, publishes its states again
+        self._last_published = None
 
         # Notify subscribers
-        for callback in self._on_music_changed_callbacks:
-            callback(music)
+        callbacks = self._on_music_changed_callbacks
+        if callbacks:
+            if music is None:
+                music = Music.from_dict(music_data)
+            for callback in callbacks:
+                callback(music)
+
+    def _set_playing(
+        self,
+        playing: bool,
+        position: Optional[int] = None
+    ) -> None:
+        """
+        Save the playing flags, and optionally the position, to the player state
+
+        Args:
+            playing (bool): Whether audio is playing
+            position (Optional[int]): New position in milliseconds, None to
+                keep it
+        """
+        state = self._state
+        state.is_playing = playing
+        state.is_paused = not playing
+        if position is not None:
+            state.audio_position = position
+        self.player_repository.update_player_state(state)
 
     def play(self) -> None:
         """
@@ -94,22 +182,14 @@ class AudioService:
             music (Music): The music track to play
         """
         self.audio.play()
-
-        # Update state in repository
-        state = self.player_repository.get_player_state()
-        state.is_paused = False
-        state.is_playing = True
-        self.player_repository.update_player_state(state)
+        self._set_playing(True)
 
     def pause(self) -> None:
         """Pause audio playback"""
         self.audio.pause()
-
-        # Update state in repository
-        state = self.player_repository.get_player_state()
-        state.is_paused = True
-        state.is_playing = False
-        self.player_repository.update_player_state(state)
+        self._set_playing(False)
+        # Playback may not resume for a while, don't leave the write buffered
+        self.player_repository.flush()
 
     def resume(self) -> None:
         """Resume audio playback"""
@@ -118,30 +198,21 @@ class AudioService:
             return
 
         self.audio.resume()
-
-        # Update state in repository
-        state = self.player_repository.get_player_state()
-        state.is_paused = False
-        state.is_playing = True
-        self.player_repository.update_player_state(state)
+        self._set_playing(True)
 
     def stop(self) -> None:
         """Stop audio playback"""
         self.audio.pause()
         self.audio.seek(0)
-
-        # Update state in repository
-        state = self.player_repository.get_player_state()
-        state.is_paused = True
-        state.is_playing = False
-        state.audio_position = 0
-        self.player_repository.update_player_state(state)
+        self._set_playing(False, position=0)
 
     def reset(self) -> None:
         """
         Reset the audio player to its initial state"""
         self.audio.release()
         self.audio.src = 'none'
+        self._duration = None
+        self._last_published = None
 
     def seek(self, position: int) -> None:
         """
@@ -152,25 +223,28 @@ class AudioService:
         """
         self.audio.seek(position)
 
-        # Update state in repository without writing to database immediately
-        state = self.player_repository.get_player_state()
+        # Buffered write, seeks in quick succession only save the last position
+        state = self._state
         state.audio_position = position
-        self.player_repository.update_player_state(state, persist=False)
+        self.player_repository.update_player_state(state)
 
-    def set_volume(self, volume: float) -> None:
+    def set_volume(self, volume: float, persist: bool = True) -> None:
         """
         Set the audio volume
 
         Args:
             volume (float): The volume level (0.0 to 1.0)
+            persist (bool): Whether to write the new volume to the database
+                (set to False while the volume slider is being dragged)
         """
         self.audio.volume = volume
+        self.audio.update()
 
         # Update state in repository
-        state = self.player_repository.get_player_state()
+        state = self._state
         state.volume = volume
         state.is_muted = volume == 0
-        self.player_repository.update_player_state(state)
+        self.player_repository.update_player_state(state, persist=persist)
 
     def toggle_mute(self) -> bool:
         """
@@ -179,7 +253,7 @@ class AudioService:
         Returns:
             bool: The new mute state
         """
-        state = self.player_repository.get_player_state()
+        state = self._state
         state.is_muted = not state.is_muted
 
         if state.is_muted:
@@ -199,13 +273,12 @@ class AudioService:
         Returns:
             bool: The new shuffle state
         """
-        state = self.player_repository.get_player_state()
+        state = self._state
         state.is_shuffle = not state.is_shuffle
 
         if state.is_shuffle:
-            state.played_music = []
-            if state.current_music:
-                state.played_music.append(state.current_music)
+            current = state.current_music
+            state.reset_played([current] if current else [])
 
         self.player_repository.update_player_state(state)
         return state.is_shuffle
@@ -217,7 +290,7 @@ class AudioService:
         Returns:
             Optional[str]: The new repeat state ("one", "all", or None)
         """
-        state = self.player_repository.get_player_state()
+        state = self._state
 
         if not state.is_repeat:
             state.is_repeat = "all"
@@ -231,7 +304,7 @@ class AudioService:
 
     def play_next(self) -> None:
         """Play the next track based on current state"""
-        state = self.player_repository.get_player_state()
+        state = self._state
 
         # Ensure we have a playlist to work with
         if not state.playlist:
@@ -246,18 +319,33 @@ class AudioService:
 
         # Play the track if we found one
         if next_music:
-            music = Music.from_dict(next_music)
-            self.load_music(music)
+            self.load_music_from_dict(next_music)
 
             if not state.is_paused:
                 self.play()
 
+    def peek_next(self) -> Optional[Dict]:
+        """
+        Get the track play_next() will pick, when it is known in advance
+
+        Returns:
+            Optional[Dict]: The next track, or None in shuffle mode or without
+                a playlist
+        """
+        state = self._state
+
+        # Shuffle picks at random, so there is nothing to predict
+        if state.is_shuffle or not state.playlist:
+            return None
+
+        return self._get_track_normal_mode(state, is_next=True)
+
     def play_previous(self) -> None:
         """Play the previous track based on current state"""
-        state = self.player_repository.get_player_state()
+        state = self._state
 
         # If we're more than 3 seconds into the song, go to the start instead of previous song
-        if self.audio.get_current_position() and self.audio.get_current_position() > 3000:
+        if self.get_current_position() > 3000:
             self.audio.seek(0)
             self.audio.resume()
             return
@@ -275,8 +363,7 @@ class AudioService:
 
         # Play the track if we found one
         if prev_music:
-            music = Music.from_dict(prev_music)
-            self.load_music(music)
+            self.load_music_from_dict(prev_music)
 
             if not state.is_paused:
                 self.play()
@@ -291,20 +378,28 @@ class AudioService:
         try:
             return self.audio.get_current_position() or 0
         except Exception as err:
-            print(f"Error getting current position: {err}")
+            # Called on every position tick, keep the failure path cheap
+            logger.debug("Error getting current position: %s", err)
             return 0
 
     def get_duration(self) -> int:
         """
         Get the audio duration in milliseconds
 
+        The duration is fixed for a track, so it is asked from the audio
+        control once and reused until another track is loaded.
+
         Returns:
             int: The audio duration
         """
+        if self._duration:
+            return self._duration
+
         try:
-            return self.audio.get_duration() or 0
+            self._duration = self.audio.get_duration() or 0
+            return self._duration
         except Exception as err:
-            print(f"Error getting audio duration: {err}")
+            logger.warning("Error getting audio duration: %s", err)
             return 0
 
     def is_playing(self) -> bool:
@@ -314,7 +409,7 @@ class AudioService:
         Returns:
             bool: True if playing, False otherwise
         """
-        state = self.player_repository.get_player_state()
+        state = self._state
         return state.is_playing
 
     def on_position_changed(self, callback: Callable[[int, int], None]) -> None:
@@ -324,7 +419,7 @@ class AudioService:
         Args:
             callback: Function with signature (position, duration)
         """
-        self._on_position_changed_callbacks.append(callback)
+        self._on_position_changed_callbacks += (callback,)
 
     def on_state_changed(self, callback: Callable[[AudioState, Dict[str, Any]], None]) -> None:
         """
@@ -333,7 +428,7 @@ class AudioService:
         Args:
             callback: Function with signature (state, music_data)
         """
-        self._on_state_changed_callbacks.append(callback)
+        self._on_state_changed_callbacks += (callback,)
 
     def on_music_changed(self, callback: Callable[[Music], None]) -> None:
         """
@@ -342,11 +437,11 @@ class AudioService:
         Args:
             callback: Function with signature (music)
         """
-        self._on_music_changed_callbacks.append(callback)
+        self._on_music_changed_callbacks += (callback,)
 
     def _on_audio_loaded(self, _) -> None:
         """Handle audio loaded event"""
-        state = self.player_repository.get_player_state()
+        state = self._state
 
         if state.is_playing:
             self.audio.play()
@@ -359,62 +454,81 @@ class AudioService:
         try:
             duration = self.audio.get_duration()
             if duration is not None:
+                self._duration = duration
                 state.audio_duration = duration
                 self.player_repository.update_player_state(state)
         except Exception as err:
-            print(f"Error getting audio duration: {err}")
+            logger.warning("Error getting audio duration: %s", err)
             # Set a default duration or leave it as is in the state
 
     def _on_audio_state_changed(self, event: AudioStateChangeEvent) -> None:
         """Handle audio state changed event"""
-        state = self.player_repository.get_player_state()
+        state = self._state
 
         if event.state == AudioState.COMPLETED:
             if state.is_repeat == "one" and state.current_music:
                 # Repeat current track
-                music = Music.from_dict(state.current_music)
-                self.load_music(music)
+                self.load_music_from_dict(state.current_music)
                 self.play()
             else:
                 self.play_next()
+            # Track boundaries are natural points to write everything buffered
+            self.player_repository.flush()
         elif event.state == AudioState.PAUSED:
-            state.is_paused = True
-            state.is_playing = False
-            self.player_repository.update_player_state(state)
+            # The backend repeats PAUSED, only save actual transitions
+            if state.is_playing or not state.is_paused:
+                self._set_playing(False)
+            self.player_repository.flush()
         elif event.state == AudioState.PLAYING:
-            state.is_paused = False
-            state.is_playing = True
-            self.player_repository.update_player_state(state)
+            # play() and resume() already saved the state before the backend
+            # confirmed it
+            if not state.is_playing or state.is_paused:
+                self._set_playing(True)
+
+        # Read once, the branches above may have loaded another track
+        current_music = state.current_music or {}
 
         # Notify subscribers
         for callback in self._on_state_changed_callbacks:
-            callback(event.state, state.current_music or {})
+            callback(event.state, current_music)
+
+        # Publish event to page, unless subscribers already know this state
+        current_filename = current_music.get('filename')
+        if (event.state, current_filename) == self._last_published:
+            return
+        self._last_published = (event.state, current_filename)
 
-        # Publish event to page
         self.page.pubsub.send_all_on_topic(
             'play:music',
             {
                 'state': event.state,
-                'current_music': state.current_music.get('filename') if state.current_music else None,
-                'current_album': state.current_music.get('album') if state.current_music else None,
+                'current_music': current_filename,
+                'current_album': current_music.get('album'),
             }
         )
 
     def _on_audio_position_changed(self, _) -> None:
         """Handle audio position changed event"""
         position = self.get_current_position()
+
+        # Save the position periodically, however often the backend reports it
+        now = time.monotonic()
+        if now - self._last_position_save >= POSITION_SAVE_INTERVAL:
+            self._last_position_save = now
+            self.player_repository.update_position(position)
+
+        # Subscribers only display the position, skip ticks that barely moved it
+        moved = abs(position - self._last_notified_position)
+        if moved < POSITION_NOTIFY_INTERVAL:
+            return
+        self._last_notified_position = position
+
         duration = self.get_duration()
 
         # Notify subscribers
         for callback in self._on_position_changed_callbacks:
             callback(position, duration)
 
-        # Update position in database periodically to avoid excessive writes
-        self._position_update_counter += 1
-        if self._position_update_counter >= 10:  # Reduced frequency (was 5)
-            self.player_repository.update_position(position)
-            self._position_update_counter = 0
-
     def _get_track_shuffle_mode(self, state: PlayerState, is_next: bool) -> Optional[Dict]:
         """
         Get next or previous track when in shuffle mode
@@ -430,32 +544,29 @@ class AudioService:
             # No current track
             if is_next:
                 # For next, choose a random track
-                return choice(state.playlist) if state.playlist else None
+                return state.next_unplayed()
             else:
                 # For previous, get the last played music if available
                 return state.played_music[-1] if state.played_music else None
 
-        # Check if current music is in the played list
-        if state.current_music in state.played_music:
-            current_index = state.played_music.index(state.current_music)
+        current_index = state.played_index(state.current_music.get('filename'))
 
+        # Check if current music is in the played list
+        if current_index is not None:
             if is_next:
                 # For next, return the next music in played list if available
                 if current_index < len(state.played_music) - 1:
                     return state.played_music[current_index + 1]
 
                 # Otherwise, get unplayed music
-                available_music = [
-                    music for music in state.playlist
-                    if music not in state.played_music
-                ]
+                next_music = state.next_unplayed()
 
-                if available_music:
-                    return choice(available_music)
+                if next_music:
+                    return next_music
                 elif state.is_repeat == "all" and state.playlist:
                     # If all have been played and repeat all is enabled
-                    state.played_music.clear()
-                    return choice(state.playlist)
+                    state.reset_played()
+                    return state.next_unplayed()
             else:
                 # For previous, return the previous music in played list if available
                 if current_index > 0:
@@ -464,16 +575,13 @@ class AudioService:
             # Current music is not in the played list (was removed or another issue)
             if is_next:
                 # For next, choose an unplayed music
-                available_music = [
-                    music for music in state.playlist
-                    if music not in state.played_music
-                ]
+                next_music = state.next_unplayed()
 
-                if available_music:
-                    return choice(available_music)
+                if next_music:
+                    return next_music
                 elif state.playlist and state.is_repeat == "all":
-                    state.played_music.clear()
-                    return choice(state.playlist)
+                    state.reset_played()
+                    return state.next_unplayed()
             else:
                 # For previous, get the last played music if available
                 return state.played_music[-1] if state.played_music else None
@@ -501,51 +609,22 @@ class AudioService:
                 return state.playlist[-1] if state.playlist else None
 
         # Check if current music is in the playlist
-        if state.current_music in state.playlist:
-            index = state.playlist.index(state.current_music)
+        index = state.playlist_index(state.current_music.get('filename'))
+        if index is not None:
+            target = index + 1 if is_next else index - 1
 
-            if is_next:
-                # For next, return the next if possible
-                if index < len(state.playlist) - 1:
-                    return state.playlist[index + 1]
-                elif state.is_repeat == "all":
-                    # If at the end and repeat all is enabled
-                    return state.playlist[0]
-            else:
-                # For previous, return the previous if possible
-                if index > 0:
-                    return state.playlist[index - 1]
-                elif state.is_repeat == "all":
-                    # If at the beginning and repeat all is enabled
-                    return state.playlist[-1]
-        else:
-            # Current music was removed from the playlist
-            current_filename = state.current_music.get('filename', '')
-
-            if is_next:
-                # For next, find the first music that comes after alphabetically
-                for music in state.playlist:
-                    if music.get('filename', '') > current_filename:
-                        return music
+            # Return the neighbour if it exists
+            if 0 <= target < len(state.playlist):
+                return state.playlist[target]
 
-                # If not found, use the first track
-                return state.playlist[0] if state.playlist else None
-            else:
-                # For previous, find the music that comes before alphabetically
-                best_match = None
-
-                for music in state.playlist:
-                    if music.get('filename', '') < current_filename:
-                        best_match = music
-                    else:
-                        # Stop when we pass the point where the current music would be
-                        break
-
-                # If a match is found, use it; otherwise, use the last track
-                if best_match:
-                    return best_match
-                elif state.playlist:
-                    return state.playlist[-1]
+            # Past either end, wrap around only if repeat all is enabled
+            if state.is_repeat == "all":
+                return state.playlist[target % len(state.playlist)]
+        else:
+            # Current music was removed from the playlist, continue from
+            # the track that comes after or before it alphabetically
+            filename = state.current_music.get('filename', '')
+            return state.playlist_neighbour(filename, is_next)
 
         return None
 
@@ -553,5 +632,5 @@ class AudioService:
         """
         Perform cleanup operations before application exit
         """
-        # Make sure to persist any cached state
-        self.player_repository.persist_cached_state()
+        # Stop idle maintenance and flush any buffered state
+        self.player_repository.shutdown()
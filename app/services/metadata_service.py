@@ -3,24 +3,332 @@ Metadata service for handling music file metadata
 """
 import os
 import re
-import asyncio
-from concurrent.futures import ThreadPoolExecutor
+import multiprocessing
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import (
+    BrokenExecutor,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor
+)
 from tinytag import TinyTag
-from typing import Dict, List, Any, Callable, Optional
+from typing import Dict, Iterator, List, Any, Callable, Optional, Set, Tuple
 
 from app.config.settings import (
     DEFAULT_DURATION_TEXT,
     DEFAULT_PLACEHOLDER_IMAGE,
-    DEFAULT_BATCH_SIZE
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_COVER_CACHE_SIZE,
+    DEFAULT_METADATA_CACHE_SIZE
 )
 from app.core.models import Music, Album
+from app.data.repositories import AlbumRepository, MusicRepository
 from app.utils.time_format import format_time
 from app.utils.image_utils import image_to_base64
 
+# Lowercase extensions of the audio files picked up by folder scans
+_SUPPORTED_EXTENSIONS = frozenset({'.mp3', '.ogg', '.flac', '.wav', '.m4a'})
+# System folders that never hold music, skipped with the hidden ones by folder
+# scans
+_SKIP_DIRECTORIES = frozenset({
+    '__MACOSX', '$RECYCLE.BIN', 'System Volume Information'
+})
+# Batches submitted to the workers and not handed over yet, bounds the memory
+# of huge scans
+_MAX_PENDING_BATCHES = 4
+
 
 class MetadataService:
     """Service for handling music file metadata extraction and processing"""
 
+    # Recently used album covers as (base64, source file, source mtime), least
+    # recently used first
+    _cover_cache: 'OrderedDict[str, Tuple[str, str, Optional[float]]]' = (
+        OrderedDict()
+    )
+    _cover_cache_lock = threading.Lock()
+    _album_repository: Optional[AlbumRepository] = None
+    _music_repository: Optional[MusicRepository] = None
+    # Worker threads shared by every folder scan, created on first use
+    _executor: Optional[ThreadPoolExecutor] = None
+    _executor_lock = threading.Lock()
+    # Worker processes parsing tags during folder scans, created on first use
+    _process_pool: Optional[Executor] = None
+    _process_pool_failed = False
+    # Placeholder cover bytes and their base64, read from disk on first use
+    _placeholder_image: Optional[bytes] = None
+    _placeholder_cover: Optional[str] = None
+    # Tag metadata without images as (cache key, metadata) by path, least
+    # recently used first. Unchanged files are not parsed again, a changed
+    # file's entry is replaced
+    _metadata_cache: (
+        'OrderedDict[str, Tuple[Tuple[str, int, int], Dict[str, Any]]]'
+    ) = OrderedDict()
+    _metadata_cache_lock = threading.Lock()
+
+    @staticmethod
+    def _get_executor() -> ThreadPoolExecutor:
+        """
+        Get the thread pool shared by folder scans, creating it on first use
+
+        Returns:
+            ThreadPoolExecutor: The shared thread pool
+        """
+        with MetadataService._executor_lock:
+            if MetadataService._executor is None:
+                MetadataService._executor = ThreadPoolExecutor(
+                    thread_name_prefix='metadata'
+                )
+            return MetadataService._executor
+
+    @staticmethod
+    def _get_process_pool() -> Executor:
+        """
+        Get the process pool parsing tags during folder scans, creating it on
+        first use
+
+        Falls back to the shared thread pool where worker processes can't be
+        started.
+
+        Returns:
+            Executor: The process pool, or the thread pool as a fallback
+        """
+        with MetadataService._executor_lock:
+            pool = MetadataService._process_pool
+            if pool is None and not MetadataService._process_pool_failed:
+                try:
+                    # Spawn fresh interpreters, forking would copy the app's
+                    # threads and locks
+                    MetadataService._process_pool = ProcessPoolExecutor(
+                        mp_context=multiprocessing.get_context('spawn')
+                    )
+                except (OSError, NotImplementedError, ValueError) as err:
+                    print(f"Error starting metadata worker processes: {err}")
+                    MetadataService._process_pool_failed = True
+
+            if MetadataService._process_pool_failed:
+                pool = None
+            else:
+                pool = MetadataService._process_pool
+
+        return pool if pool is not None else MetadataService._get_executor()
+
+    @staticmethod
+    def shutdown() -> None:
+        """
+        Stop the scan thread and process pools, dropping work that has not
+        started
+        Use when the application is closing
+        """
+        with MetadataService._executor_lock:
+            pools = (MetadataService._executor, MetadataService._process_pool)
+            MetadataService._executor = None
+            MetadataService._process_pool = None
+
+        for pool in pools:
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _get_placeholder_image() -> bytes:
+        """
+        Get the placeholder cover shown for tracks without album art
+
+        Returns:
+            bytes: The placeholder image, shared by every caller
+        """
+        if MetadataService._placeholder_image is None:
+            with open(DEFAULT_PLACEHOLDER_IMAGE, 'rb') as image_file:
+                MetadataService._placeholder_image = image_file.read()
+        return MetadataService._placeholder_image
+
+    @staticmethod
+    def _cover_to_base64(image: Optional[bytes]) -> Optional[str]:
+        """
+        Encode a cover image to base64, reusing the encoded placeholder
+
+        Tracks without album art get the placeholder, so it is encoded once
+        instead of once per track.
+
+        Args:
+            image (Optional[bytes]): The cover image, None for the placeholder
+
+        Returns:
+            Optional[str]: The base64 encoded cover
+        """
+        placeholder = MetadataService._get_placeholder_image()
+        if image is not None and image != placeholder:
+            return image_to_base64(image)
+
+        if MetadataService._placeholder_cover is None:
+            MetadataService._placeholder_cover = image_to_base64(placeholder)
+        return MetadataService._placeholder_cover
+
+    @staticmethod
+    def _metadata_cache_key(file: str) -> Optional[Tuple[str, int, int]]:
+        """
+        Get the metadata cache key of a file
+
+        Args:
+            file (str): Path to the music file
+
+        Returns:
+            Optional[Tuple[str, int, int]]: The (path, mtime in ns, size) key,
+                or None if the file can't be read
+        """
+        try:
+            stat = os.stat(file)
+            return (file, stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    @staticmethod
+    def _get_cached_metadata(
+        cache_key: Optional[Tuple[str, int, int]]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get the cached metadata of a file, if it didn't change since it was
+        parsed
+
+        Args:
+            cache_key (Optional[Tuple[str, int, int]]): The metadata cache key
+                of the file
+
+        Returns:
+            Optional[Dict[str, Any]]: The cached metadata, or None if missing
+                or stale
+        """
+        if cache_key is None:
+            return None
+
+        file = cache_key[0]
+        cache = MetadataService._metadata_cache
+        with MetadataService._metadata_cache_lock:
+            entry = cache.get(file)
+            if entry is None or entry[0] != cache_key:
+                return None
+
+            cache.move_to_end(file)
+            return entry[1]
+
+    @staticmethod
+    def _cache_metadata(
+        cache_key: Optional[Tuple[str, int, int]],
+        metadata: Dict[str, Any]
+    ) -> None:
+        """
+        Cache the metadata of a file, replacing the entry of an older version
+        of it
+
+        Args:
+            cache_key (Optional[Tuple[str, int, int]]): The metadata cache key
+                of the file
+            metadata (Dict[str, Any]): The metadata parsed from the file
+        """
+        if cache_key is None:
+            return
+
+        file = cache_key[0]
+        cache = MetadataService._metadata_cache
+        with MetadataService._metadata_cache_lock:
+            cache[file] = (cache_key, metadata)
+            cache.move_to_end(file)
+            if len(cache) > DEFAULT_METADATA_CACHE_SIZE:
+                cache.popitem(last=False)
+
+    @staticmethod
+    def _title_from_filename(file: str) -> str:
+        """
+        Get a title for a track without one, from its filename without extension
+
+        Args:
+            file (str): Path to the music file
+
+        Returns:
+            str: The title
+        """
+        name = os.path.basename(file)
+        dot = name.rfind('.')
+        return name[:dot] if dot > 0 else name
+
+    @staticmethod
+    def _read_tags(file: str, with_image: bool = False) -> Dict[str, Any]:
+        """
+        Parse the tags of a music file
+
+        Runs in the scan worker processes, so it must not rely on any state
+        of the application process.
+
+        Args:
+            file (str): Path to the music file
+            with_image (bool): Whether to include album art image data
+
+        Returns:
+            Dict[str, Any]: Dictionary with metadata
+
+        Raises:
+            Exception: If the file can't be parsed
+        """
+        tag = TinyTag.get(file, image=with_image)
+
+        title = tag.title
+        if title:
+            track = tag.track
+            if track:
+                title = f'{track}. {title}'
+        else:
+            title = MetadataService._title_from_filename(file)
+
+        # Extract year from tag if available
+        tag_year = None
+        if tag.year:
+            match = re.search(r'\b\d{4}\b', str(tag.year))
+            tag_year = match.group(0) if match else tag.year
+
+        metadata = {
+            'title': title,
+            'artist': tag.artist or 'Artista desconhecido',
+            'album': tag.album or 'Álbum desconhecido',
+            'album_artist': tag.albumartist or 'Artista desconhecido',
+            'year': tag_year,
+            'track': tag.track,
+            'genre': tag.genre,
+            'duration': format_time(tag.duration, is_in_seconds=True),
+            'filename': file,
+        }
+
+        if with_image:
+            front_cover = tag.images.front_cover
+            if front_cover:
+                metadata['image'] = front_cover.data
+            else:
+                metadata['image'] = MetadataService._get_placeholder_image()
+
+        return metadata
+
+    @staticmethod
+    def _fallback_metadata(file: str, err: Exception) -> Dict[str, Any]:
+        """
+        Get the metadata of a file whose tags can't be read
+
+        Args:
+            file (str): Path to the music file
+            err (Exception): The error raised while reading the tags
+
+        Returns:
+            Dict[str, Any]: Dictionary with metadata derived from the filename
+        """
+        print(f"Error loading metadata for {file}: {err}")
+        return {
+            'title': MetadataService._title_from_filename(file),
+            'artist': 'Artista desconhecido',
+            'album': 'Álbum desconhecido',
+            'duration': DEFAULT_DURATION_TEXT,
+            'filename': file,
+        }
+
     @staticmethod
     def load_music_metadata(file: str, with_image: bool = False) -> Dict[str, Any]:
         """
@@ -31,47 +339,101 @@ class MetadataService:
             with_image (bool): Whether to include album art image data
 
         Returns:
-            Dict[str, Any]: Dictionary with metadata
+            Dict[str, Any]: Dictionary with metadata, shared with later calls
+                for the same unchanged file so it must not be modified
+        """
+        cache_key = None
+        if not with_image:
+            cache_key = MetadataService._metadata_cache_key(file)
+            metadata = MetadataService._get_cached_metadata(cache_key)
+            if metadata is not None:
+                return metadata
+
+        try:
+            metadata = MetadataService._read_tags(file, with_image)
+        except Exception as err:
+            return MetadataService._fallback_metadata(file, err)
+
+        MetadataService._cache_metadata(cache_key, metadata)
+
+        return metadata
+
+    @staticmethod
+    def _submit_music_metadata(
+        file: str,
+        with_image: bool = False
+    ) -> Tuple[Optional[Tuple[str, int, int]], Future]:
+        """
+        Start loading metadata from a music file, parsing its tags in a worker
+        process
+
+        Tag parsing is pure Python, so worker processes parse files truly
+        in parallel where threads would take turns holding the GIL.
+
+        Args:
+            file (str): Path to the music file
+            with_image (bool): Whether to include album art image data,
+                unchanged files are not parsed again so their metadata never
+                has it
+
+        Returns:
+            Tuple[Optional[Tuple[str, int, int]], Future]: The metadata cache
+                key of the file and the future of its metadata, already done
+                for unchanged files
         """
+        cache_key = MetadataService._metadata_cache_key(file)
+        metadata = MetadataService._get_cached_metadata(cache_key)
+        if metadata is not None:
+            future = Future()
+            future.set_result(metadata)
+            return cache_key, future
+
         try:
-            tag = TinyTag.get(file, image=with_image)
-
-            title = (f'{tag.track}. {tag.title}' if tag.track else tag.title) \
-                if tag.title else os.path.basename(file).split('.')[0]
-
-            # Extract year from tag if available
-            tag_year = None
-            if tag.year:
-                match = re.search(r'\b\d{4}\b', str(tag.year))
-                tag_year = match.group(0) if match else tag.year
-
-            metadata = {
-                'title': title,
-                'artist': tag.artist or 'Artista desconhecido',
-                'album': tag.album or 'Álbum desconhecido',
-                'album_artist': tag.albumartist or 'Artista desconhecido',
-                'year': tag_year,
-                'track': tag.track,
-                'genre': tag.genre,
-                'duration': format_time(tag.duration, is_in_seconds=True),
-                'filename': file,
-            }
-
-            if with_image:
-                metadata['image'] = tag.images.front_cover.data \
-                    if tag.images.front_cover else open(DEFAULT_PLACEHOLDER_IMAGE, 'rb').read()
-
-            return metadata
+            return cache_key, MetadataService._get_process_pool().submit(
+                MetadataService._read_tags, file, with_image
+            )
+        except BrokenExecutor:
+            # Worker processes can't run here, parse on the thread pool from
+            # now on
+            MetadataService._process_pool_failed = True
+            return cache_key, MetadataService._get_executor().submit(
+                MetadataService.load_music_metadata, file, with_image
+            )
+
+    @staticmethod
+    def _music_metadata_result(
+        file: str,
+        cache_key: Optional[Tuple[str, int, int]],
+        future: Future
+    ) -> Tuple[Dict[str, Any], Optional[bytes]]:
+        """
+        Wait for the metadata started by _submit_music_metadata
+
+        Args:
+            file (str): Path to the music file
+            cache_key (Optional[Tuple[str, int, int]]): The metadata cache key
+                of the file
+            future (Future): The future of its metadata
+
+        Returns:
+            Tuple[Dict[str, Any], Optional[bytes]]: Dictionary with metadata,
+                shared like load_music_metadata's, and the album art if it was
+                requested and parsed
+        """
+        try:
+            metadata = future.result()
+        except BrokenExecutor:
+            MetadataService._process_pool_failed = True
+            return MetadataService.load_music_metadata(file), None
         except Exception as err:
-            print(f"Error loading metadata for {file}: {err}")
-            filename = os.path.basename(file)
-            return {
-                'title': filename.split('.')[0],
-                'artist': 'Artista desconhecido',
-                'album': 'Álbum desconhecido',
-                'duration': DEFAULT_DURATION_TEXT,
-                'filename': file,
-            }
+            return MetadataService._fallback_metadata(file, err), None
+
+        # Parsed for this scan only, the cached metadata never holds images
+        image = metadata.pop('image', None)
+
+        MetadataService._cache_metadata(cache_key, metadata)
+
+        return metadata, image
 
     @staticmethod
     def load_music_cover(file: str) -> bytes:
@@ -87,114 +449,384 @@ class MetadataService:
         try:
             # Reuse existing load_music_metadata method with image loading enabled
             metadata = MetadataService.load_music_metadata(file, with_image=True)
-            if 'image' in metadata:
-                return image_to_base64(metadata['image'])
-            else:
-                # Fallback to default image
-                image = open(DEFAULT_PLACEHOLDER_IMAGE, 'rb').read()
-                return image_to_base64(image)
+            # Fallback to default image
+            return MetadataService._cover_to_base64(metadata.get('image'))
         except Exception as err:
             print(f"Error loading cover for {file}: {err}")
-            image = open(DEFAULT_PLACEHOLDER_IMAGE, 'rb').read()
-            return image_to_base64(image)
+            return MetadataService._cover_to_base64(None)
+
+    @staticmethod
+    def _album_cover_key(music: Music) -> str:
+        """
+        Get the cover cache key of a track
+
+        Args:
+            music (Music): The music track
+
+        Returns:
+            str: The album key, or the filename for tracks without album info
+        """
+        # Tracks without album info can't share a cover, key them by file
+        if music.album and music.album != 'Álbum desconhecido':
+            return f"{music.album}:{music.album_artist}"
+        return music.filename
 
     @staticmethod
-    async def scan_folder_async(
+    def _file_mtime(file: str) -> Optional[float]:
+        """
+        Get the modification time of a file
+
+        Args:
+            file (str): Path to the file
+
+        Returns:
+            Optional[float]: The modification time, or None if the file can't
+                be read
+        """
+        try:
+            return os.stat(file).st_mtime
+        except OSError:
+            return None
+
+    @staticmethod
+    def peek_album_cover(music: Music) -> Optional[str]:
+        """
+        Get the album cover of a track only if it is already cached
+
+        An entry decoded from this very file is dropped when the file was
+        modified since, so retagged covers are picked up.
+
+        Args:
+            music (Music): The music track
+
+        Returns:
+            Optional[str]: Album cover image as base64, or None if not cached
+        """
+        key = MetadataService._album_cover_key(music)
+        cache = MetadataService._cover_cache
+        with MetadataService._cover_cache_lock:
+            entry = cache.get(key)
+            if entry is None:
+                return None
+
+            cover, source, mtime = entry
+            if source == music.filename and (
+                mtime != MetadataService._file_mtime(source)
+            ):
+                del cache[key]
+                return None
+
+            cache.move_to_end(key)
+            return cover
+
+    @staticmethod
+    def _get_album_repository() -> AlbumRepository:
+        """
+        Get the album repository shared by the service, creating it on first use
+
+        Returns:
+            AlbumRepository: The album repository
+        """
+        if MetadataService._album_repository is None:
+            MetadataService._album_repository = AlbumRepository()
+        return MetadataService._album_repository
+
+    @staticmethod
+    def _get_music_repository() -> MusicRepository:
+        """
+        Get the music repository shared by the service, creating it on first use
+
+        Returns:
+            MusicRepository: The music repository
+        """
+        if MetadataService._music_repository is None:
+            MetadataService._music_repository = MusicRepository()
+        return MetadataService._music_repository
+
+    @staticmethod
+    def _covered_directories(
         folder_path: str,
-        batch_size = DEFAULT_BATCH_SIZE,
-        process_callback: Optional[Callable[[List[Music], List[Album]], None]] = None
+        albums_with_cover: Set[str]
+    ) -> Set[str]:
+        """
+        Get the subfolders of a scanned folder whose albums already have a
+        stored cover
+
+        A file's album is only known once its tags are parsed, so the tracks
+        saved by earlier scans tell which subfolders don't need their art.
+
+        Args:
+            folder_path (str): Path to the scanned folder
+            albums_with_cover (Set[str]): Keys of the albums with a stored
+                cover
+
+        Returns:
+            Set[str]: Subfolders whose stored tracks all belong to albums with
+                a cover
+        """
+        repository = MetadataService._get_music_repository()
+        covered = set()
+        uncovered = set()
+        for music in repository.get_music_by_folder_path(folder_path):
+            if not music.album:
+                continue
+            directory = os.path.dirname(music.filename)
+            if f"{music.album}:{music.album_artist}" in albums_with_cover:
+                covered.add(directory)
+            else:
+                uncovered.add(directory)
+
+        return covered - uncovered
+
+    @staticmethod
+    def _stored_album_cover(music: Music) -> Optional[str]:
+        """
+        Get the cover saved for the track's album by the folder scan
+
+        Args:
+            music (Music): The music track
+
+        Returns:
+            Optional[str]: Album cover image as base64, or None if not stored
+        """
+        if not music.album or music.album == 'Álbum desconhecido':
+            return None
+
+        return MetadataService._get_album_repository().get_album_cover(
+            music.album, music.album_artist
+        )
+
+    @staticmethod
+    def load_album_cover(music: Music) -> str:
+        """
+        Load the album cover of a track, sharing a cached copy per album
+
+        Args:
+            music (Music): The music track
+
+        Returns:
+            str: Album cover image as base64
+        """
+        cover = MetadataService.peek_album_cover(music)
+        if cover is not None:
+            return cover
+
+        # The scan stores every album's cover, prefer it to parsing the file
+        source, mtime = None, None
+        cover = MetadataService._stored_album_cover(music)
+
+        if cover is None:
+            # Decode outside the lock, a duplicate load is cheaper than blocking
+            source = music.filename
+            mtime = MetadataService._file_mtime(source)
+            cover = MetadataService.load_music_cover(music.filename)
+
+        key = MetadataService._album_cover_key(music)
+        cache = MetadataService._cover_cache
+        with MetadataService._cover_cache_lock:
+            cache[key] = (cover, source, mtime)
+            cache.move_to_end(key)
+            if len(cache) > DEFAULT_COVER_CACHE_SIZE:
+                cache.popitem(last=False)
+
+        return cover
+
+    @staticmethod
+    def _iter_music_files(folder_path: str) -> Iterator[str]:
+        """
+        Walk a folder and its subfolders for supported music files
+
+        Uses os.scandir, whose entries already know if they are
+        directories, so no extra stat call is made per file.
+
+        Args:
+            folder_path (str): Path to the folder to walk
+
+        Yields:
+            str: Path of each music file found
+        """
+        directories = [folder_path]
+
+        while directories:
+            directory = directories.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        name = entry.name
+
+                        # Hidden files and folders are OS or player metadata,
+                        # like macOS ._ resource forks or .Trash-1000
+                        if name.startswith('.'):
+                            continue
+
+                        # Like os.walk, don't follow links to directories
+                        if entry.is_dir(follow_symlinks=False):
+                            if name not in _SKIP_DIRECTORIES:
+                                directories.append(entry.path)
+                            continue
+
+                        dot = name.rfind('.')
+                        if dot <= 0:
+                            continue
+                        if name[dot:].lower() in _SUPPORTED_EXTENSIONS:
+                            yield entry.path
+            except OSError as err:
+                print(f"Error reading folder {directory}: {err}")
+
+    @staticmethod
+    def _scan_impl(
+        folder_path: str,
+        batch_size: int,
+        process_callback: Optional[Callable[[List[Music], List[Album]], None]],
+        executor: Executor
     ) -> tuple[List[Music], List[Album]]:
         """
-        Scan a folder for music files asynchronously and extract metadata
+        Scan a folder for music files and extract metadata, blocking until done
 
         Args:
             folder_path (str): Path to the folder to scan
             batch_size (int): Number of files to process in each batch
             process_callback (Optional[Callable]): Optional callback for incremental processing
+            executor (Executor): Thread pool decoding the album covers
 
         Returns:
             tuple[List[Music], List[Album]]: Tuple containing list of Music objects and list of Album objects
         """
-        supported_extensions = ['.mp3', '.ogg', '.flac', '.wav', '.m4a']
         music_files = []
-        file_paths = []
         # Dictionary to store albums by album:artist key
         albums_dict = {}
 
         try:
-            # Get all files in the folder and its subfolders in parallel
-            for root, _, files in os.walk(folder_path):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    file_ext = os.path.splitext(file)[1].lower()
-                    if file_ext in supported_extensions:
-                        file_paths.append(file_path)
-
-            total_files = len(file_paths)
-
-            # Process files in parallel using ThreadPoolExecutor
-            with ThreadPoolExecutor() as executor:
-                for i in range(0, total_files, batch_size):
-                    batch_files = file_paths[i:i+batch_size]
-                    batch_tasks = []
-
-                    for file_path in batch_files:
-                        batch_tasks.append(
-                            asyncio.get_event_loop().run_in_executor(
-                                executor,
-                                MetadataService.load_music_metadata,
-                                file_path
-                            )
-                        )
-
-                    results = await asyncio.gather(*batch_tasks)
-
-                    batch_musics = []
-                    # Track albums updated in this batch
-                    albums_updated_in_batch = set()
-
-                    for metadata in results:
-                        music = Music(
-                            title=metadata['title'],
-                            artist=metadata['artist'],
-                            album=metadata['album'],
-                            album_artist=metadata['album_artist'],
-                            filename=metadata['filename'],
-                            folder=folder_path,
-                            duration=metadata['duration'],
-                            track_number=metadata.get('track'),
-                            year=metadata.get('year'),
-                            genre=metadata.get('genre')
-                        )
-                        music_files.append(music)
-                        batch_musics.append(music)
-
-                        # Skip tracks without album info
-                        if not music.album:
-                            continue
+            # Albums saved by earlier scans keep their cover, don't decode it
+            # again
+            albums_with_cover = (
+                MetadataService._get_album_repository()
+                .get_album_keys_with_cover()
+            )
+            # Subfolders whose art would only be parsed to be thrown away
+            covered_directories = MetadataService._covered_directories(
+                folder_path, albums_with_cover
+            )
 
-                        # Group by album
+            def process_batch(batch_tasks):
+                batch_musics = []
+                # Track albums updated in this batch
+                albums_updated_in_batch = set()
+                # First track of each album seen for the first time in this
+                # batch
+                new_albums = {}
+                # Album art parsed along with the tags, by filename
+                images = {}
+
+                for file_path, cache_key, future in batch_tasks:
+                    metadata, image = MetadataService._music_metadata_result(
+                        file_path, cache_key, future
+                    )
+                    if image is not None:
+                        images[file_path] = image
+                    music = Music.from_metadata(metadata, folder_path)
+                    music_files.append(music)
+                    batch_musics.append(music)
+
+                    if music.album:
                         album_key = f"{music.album}:{music.album_artist}"
                         if album_key not in albums_dict:
-                            album_cover = MetadataService.load_music_cover(music.filename)
-                            albums_dict[album_key] = Album(
-                                name=music.album,
-                                artist=music.album_artist,
-                                year=music.year,
-                                genre=music.genre,
-                                cover=album_cover,
-                            )
-
-                        # Add the music to the album's tracks
-                        albums_dict[album_key].tracks.append(music)
-                        # Mark this album as updated in this batch
-                        albums_updated_in_batch.add(album_key)
-
-                    # Include all albums updated in this batch in the callback
-                    batch_albums = [albums_dict[key] for key in albums_updated_in_batch]
-
-                    if process_callback and batch_musics:
-                        process_callback(batch_musics, batch_albums)
+                            new_albums.setdefault(album_key, music)
+
+                # Use the covers parsed with the tags, and decode the other
+                # new albums' in parallel, unless already stored
+                covers = {}
+                needs_cover = []
+                for album_key, music in new_albums.items():
+                    if album_key in albums_with_cover:
+                        continue
+                    image = images.get(music.filename)
+                    if image is not None:
+                        covers[album_key] = (
+                            MetadataService._cover_to_base64(image)
+                        )
+                    else:
+                        needs_cover.append(album_key)
+
+                covers.update(zip(needs_cover, executor.map(
+                    MetadataService.load_music_cover,
+                    [new_albums[key].filename for key in needs_cover]
+                )))
+
+                for album_key, music in new_albums.items():
+                    albums_dict[album_key] = Album(
+                        name=music.album,
+                        artist=music.album_artist,
+                        year=music.year,
+                        genre=music.genre,
+                        cover=covers.get(album_key),
+                    )
+
+                for music in batch_musics:
+                    # Skip tracks without album info
+                    if not music.album:
+                        continue
+
+                    # Group by album
+                    album_key = f"{music.album}:{music.album_artist}"
+
+                    # Add the music to the album's tracks
+                    albums_dict[album_key].tracks.append(music)
+                    # Mark this album as updated in this batch
+                    albums_updated_in_batch.add(album_key)
+
+                # Include all albums updated in this batch in the callback
+                batch_albums = [
+                    albums_dict[key] for key in albums_updated_in_batch
+                ]
+
+                if process_callback and batch_musics:
+                    process_callback(batch_musics, batch_albums)
+
+            # Files are submitted while the folder is still being walked,
+            # so the workers decode tags instead of waiting for the walk
+            batches = deque()
+            batch_tasks = []
+            directory = None
+            for file_path in MetadataService._iter_music_files(folder_path):
+                # Albums usually have a folder of their own, so the art of the
+                # first file of each folder is parsed with its tags instead of
+                # in a second pass, unless the folder's album already has a
+                # stored cover
+                file_directory = os.path.dirname(file_path)
+                with_image = (
+                    file_directory != directory
+                    and file_directory not in covered_directories
+                )
+                directory = file_directory
+
+                batch_tasks.append((
+                    file_path,
+                    *MetadataService._submit_music_metadata(
+                        file_path, with_image
+                    )
+                ))
+                if len(batch_tasks) < batch_size:
+                    continue
+
+                batches.append(batch_tasks)
+                batch_tasks = []
+
+                # Hand over the batches that are already decoded without
+                # waiting for the others
+                while batches and all(task[2].done() for task in batches[0]):
+                    process_batch(batches.popleft())
+
+                # Let the workers catch up with the walk before submitting
+                # more files
+                if len(batches) >= _MAX_PENDING_BATCHES:
+                    process_batch(batches.popleft())
+
+            if batch_tasks:
+                batches.append(batch_tasks)
+
+            while batches:
+                process_batch(batches.popleft())
 
         except Exception as err:
             print(f"Error scanning folder {folder_path}: {err}")
@@ -218,13 +850,12 @@ class MetadataService:
         Returns:
             tuple[List[Music], List[Album]]: Tuple containing list of Music objects and list of Album objects
         """
-        loop = asyncio.new_event_loop()
-        try:
-            return loop.run_until_complete(
-                MetadataService.scan_folder_async(folder_path, batch_size, process_callback)
-            )
-        finally:
-            loop.close()
+        return MetadataService._scan_impl(
+            folder_path,
+            batch_size,
+            process_callback,
+            MetadataService._get_executor()
+        )
 
     @staticmethod
     def extract_folder_name(folder_path: str) -> str:
@@ -39,6 +39,8 @@ class AppWindow:
         """
         self.page = page
         self.app_repository = AppRepository()
+        # Tab views by index, built on first visit and reused afterwards
+        self._views = {}
         self.app_state = self.app_repository.get_app_state()
 
         self.initialize_window()
@@ -118,28 +120,8 @@ class AppWindow:
         Args:
             index_view (int): Index of the view to display
         """
-        self.views_container.content = None
-
-        if index_view == 0:
-            self.views_container.content = Column(
-                controls=[
-                    self.navigation_bar,
-                    MusicsView(
-                        page=self.page,
-                        audio_service=self.audio_service
-                    )
-                ]
-            )
-        elif index_view == 1:
-            self.views_container.content = Column(
-                controls=[
-                    self.navigation_bar,
-                    AlbumsView(
-                        page=self.page,
-                        audio_service=self.audio_service
-                    )
-                ]
-            )
+        if index_view in (0, 1):
+            self.views_container.content = self._get_tab_view(index_view)
         elif index_view == 2:
             self.views_container.content = AlbumView(
                 page=self.page,
@@ -149,6 +131,35 @@ class AppWindow:
 
         self.views_container.update()
 
+    def _get_tab_view(self, index_view: int) -> Column:
+        """
+        Get the view of a navigation tab, building it on first use
+
+        The tab views keep themselves up to date through their pubsub
+        subscriptions, so switching back to a tab reuses it instead of
+        rebuilding its controls and querying the library again.
+
+        Args:
+            index_view (int): Index of the tab view
+
+        Returns:
+            Column: The navigation bar and the tab view
+        """
+        view = self._views.get(index_view)
+        if view is None:
+            view_class = MusicsView if index_view == 0 else AlbumsView
+            view = Column(
+                controls=[
+                    self.navigation_bar,
+                    view_class(
+                        page=self.page,
+                        audio_service=self.audio_service
+                    )
+                ]
+            )
+            self._views[index_view] = view
+        return view
+
     def on_navbar_change(self, event: ControlEvent):
         """
         Handle navigation bar changes
@@ -28,6 +28,9 @@ from app.data.repositories import MusicRepository, PlayerRepository
 from app.services.audio_service import AudioService
 from app.utils.helpers import safe_update
 
+# Row hover and divider color, shared by every row instead of built per track
+_ROW_OVERLAY = Colors.with_opacity(0.4, AppColors.GREY)
+
 
 class MusicListComponent(Container):
     """Component to display a list of music tracks"""
@@ -122,10 +125,7 @@ class MusicListComponent(Container):
                 shape=RoundedRectangleBorder(4),
                 mouse_cursor=MouseCursor.BASIC,
                 content_padding=padding.only(left=5, right=25),
-                hover_color=Colors.with_opacity(
-                    0.4,
-                    AppColors.GREY
-                ),
+                hover_color=_ROW_OVERLAY,
                 leading=play_button,
                 title=Text(
                     music.title,
@@ -155,10 +155,7 @@ class MusicListComponent(Container):
                         thickness=1,
                         leading_indent=4,
                         trailing_indent=4,
-                        color=Colors.with_opacity(
-                            0.4,
-                            AppColors.GREY
-                        ),
+                        color=_ROW_OVERLAY,
                     ),
                     music_row_tile
                 ]
@@ -286,8 +283,8 @@ class MusicListComponent(Container):
         """
         all_musics = [m.to_dict() for m in self._load_musics()]
         player_state = self.audio_service.player_repository.get_player_state()
-        player_state.playlist = all_musics
-        player_state.playlist_source = "all"  # Mark that we're playing from all songs
+        # Mark that we're playing from all songs
+        player_state.set_playlist(all_musics, source="all")
         self.audio_service.player_repository.update_player_state(player_state)
         self.audio_service.load_music(music)
         self.audio_service.play()
@@ -23,6 +23,7 @@ from typing import Callable
 from app.config.colors import AppColors
 from app.config.settings import APP_NAME
 from app.services.audio_service import AudioService
+from app.services.metadata_service import MetadataService
 from app.utils.helpers import safe_update
 
 
@@ -158,8 +159,12 @@ class AppBar(Container):
 
         if state.is_playing:
             state.is_playing = False
-            state.is_pause = True
+            state.is_paused = True
             repository.update_player_state(state)
 
-        # Close the application
+        # Stop background work and flush pending state
+        self.audio_service.cleanup()
+        MetadataService.shutdown()
+
+        # Close the application, no page update needed as the window goes away
         self.page.window.close()
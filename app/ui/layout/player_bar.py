@@ -20,6 +20,7 @@ from flet import (
     TextOverflow,
 )
 from flet_audio import AudioState
+from typing import Optional
 
 from app.config.colors import AppColors
 from app.config.settings import (
@@ -32,7 +33,17 @@ from app.data.repositories import PlayerRepository, MusicRepository
 from app.services.audio_service import AudioService
 from app.services.metadata_service import MetadataService
 from app.utils.time_format import format_time
-from app.utils.helpers import safe_update
+from app.utils.helpers import batch_updates, safe_update
+
+# Press highlight shared by the player buttons
+_BUTTON_HIGHLIGHT = Colors.with_opacity(0.1, AppColors.GREY)
+
+# (upper bound, icon) pairs, the first bound the volume does not exceed wins
+_VOLUME_ICONS = (
+    (0.0, Icons.VOLUME_OFF),
+    (0.44, Icons.VOLUME_DOWN),
+    (float('inf'), Icons.VOLUME_UP),
+)
 
 
 class PlayerBar(Container):
@@ -61,6 +72,12 @@ class PlayerBar(Container):
         self._volume = self.player_state.volume
         self._is_playing = False
         self._was_playing = False
+        # Last whole second drawn by on_position_changed
+        self._last_second = -1
+        # Duration of the current track, in milliseconds
+        self._duration = None
+        # Bumped per track so stale cover loads are dropped
+        self._cover_generation = 0
 
         # Create UI components
         self._create_ui_components()
@@ -211,7 +228,7 @@ class PlayerBar(Container):
             icon_color=AppColors.WHITE,
             icon_size=28,
             hover_color=AppColors.TRANSPARENT,
-            highlight_color=Colors.with_opacity(0.1, AppColors.GREY),
+            highlight_color=_BUTTON_HIGHLIGHT,
             on_click=lambda _: self.audio_service.play_previous()
         )
 
@@ -221,7 +238,7 @@ class PlayerBar(Container):
             icon=Icons.SKIP_NEXT,
             icon_color=AppColors.WHITE,
             hover_color=AppColors.TRANSPARENT,
-            highlight_color=Colors.with_opacity(0.1, AppColors.GREY),
+            highlight_color=_BUTTON_HIGHLIGHT,
             on_click=lambda _: self.audio_service.play_next()
         )
 
@@ -230,7 +247,7 @@ class PlayerBar(Container):
             icon_color=AppColors.PRIMARY if self._is_shuffle else AppColors.GREY_LIGHT_100,
             hover_color=AppColors.TRANSPARENT,
             tooltip='Embaralhar: ' + ('Ativado' if self._is_shuffle else 'Desativado'),
-            highlight_color=Colors.with_opacity(0.1, AppColors.GREY),
+            highlight_color=_BUTTON_HIGHLIGHT,
             on_click=lambda _: self._update_shuffle_state()
         )
 
@@ -239,7 +256,7 @@ class PlayerBar(Container):
             icon_color=AppColors.PRIMARY if self._is_repeat else AppColors.GREY_LIGHT_100,
             hover_color=AppColors.TRANSPARENT,
             tooltip='Repetir: ' + ('Um' if self._is_repeat == 'one' else 'Tudo' if self._is_repeat == 'all' else 'Desativado'),
-            highlight_color=Colors.with_opacity(0.1, AppColors.GREY),
+            highlight_color=_BUTTON_HIGHLIGHT,
             on_click=lambda _: self._update_repeat_state()
         )
 
@@ -249,7 +266,7 @@ class PlayerBar(Container):
             icon=self._get_volume_icon(self._volume, self._is_muted),
             icon_color=AppColors.WHITE,
             hover_color=AppColors.TRANSPARENT,
-            highlight_color=Colors.with_opacity(0.1, AppColors.GREY),
+            highlight_color=_BUTTON_HIGHLIGHT,
             on_click=lambda _: self._toggle_mute()
         )
 
@@ -261,7 +278,8 @@ class PlayerBar(Container):
             label='{value}',
             active_color=AppColors.PRIMARY,
             inactive_color=AppColors.GREY,
-            on_change=lambda e: self._set_volume(e.control.value),
+            on_change=lambda e: self._preview_volume(e.control.value),
+            on_change_end=lambda e: self._set_volume(e.control.value),
         )
 
     def _register_callbacks(self):
@@ -277,12 +295,14 @@ class PlayerBar(Container):
         if self.player_state.current_music:
             try:
                 current_music = Music.from_dict(self.player_state.current_music)
-                self._update_music_info(current_music)
+                position = self.player_state.audio_position
+                duration = self.player_state.audio_duration
 
-                if self.player_state.audio_position is not None and self.player_state.audio_duration is not None:
-                    self._update_current_time(self.player_state.audio_position)
-                    self._update_end_time(self.player_state.audio_position, self.player_state.audio_duration)
-                    self._update_progress_time(self.player_state.audio_position, self.player_state.audio_duration)
+                with batch_updates(self):
+                    self._update_music_info(current_music)
+
+                    if position is not None and duration is not None:
+                        self.on_position_changed(position, duration)
             except Exception as err:
                 print(f"Error initializing music info: {err}")
 
@@ -298,50 +318,88 @@ class PlayerBar(Container):
         self.current_time.value = format_time(position)
         safe_update(self)
 
-    def _update_end_time(self, position: int, duration: int):
+    def _update_duration(self, duration: Optional[int]):
+        """Update the duration derived state, only when the duration changes"""
+        if duration == self._duration:
+            return
+
+        self._duration = duration
+        if duration is not None and duration > 0:
+            self.progress_time.max = duration
+
+    def _update_end_time(self, position: int):
         """Update the end time display"""
-        try:
-            if duration is None:
-                self.end_time.value = DEFAULT_DURATION_TEXT
-            else:
-                new_time = duration - position
-                self.end_time.value = format_time(new_time)
-            safe_update(self)
-        except Exception as err:
-            print(f'Error updating end time: {err}')
+        if self._duration is None:
             self.end_time.value = DEFAULT_DURATION_TEXT
-            safe_update(self)
+        else:
+            self.end_time.value = format_time(self._duration - position)
+        safe_update(self)
 
-    def _update_progress_time(self, current_position: int, end_position: int):
+    def _update_progress_time(self, position: int):
         """Update the progress slider"""
-        try:
-            self.progress_time.value = current_position
-            if end_position is not None and end_position > 0:
-                self.progress_time.max = end_position
-            safe_update(self)
-        except Exception as err:
-            print(f'Error updating progress time: {err}')
+        self.progress_time.value = position
+        safe_update(self)
 
     def _update_music_info(self, music: Music):
         """Update the displayed music information"""
-        self.music_title.value = music.title
-        self.music_artist.value = music.artist
-        self.end_time.value = music.duration
-        self.current_time.value = DEFAULT_DURATION_TEXT
-        self.progress_time.value = 0
-        self._update_music_cover(music.filename)
-        safe_update(self.page)
-
-    def _update_music_cover(self, filename: str):
-        """Update the music cover image"""
-        try:
-            cover = MetadataService.load_music_cover(filename)
+        with batch_updates(self):
+            self.music_title.value = music.title
+            self.music_artist.value = music.artist
+            self.end_time.value = music.duration
+            self.current_time.value = DEFAULT_DURATION_TEXT
+            self.progress_time.value = 0
+            self._last_second = -1
+            self._duration = None
+            self._update_music_cover(music)
+
+        self._preload_next_cover()
+
+    def _update_music_cover(self, music: Music):
+        """Update the music cover image, decoding it in the background"""
+        self._cover_generation += 1
+
+        cover = MetadataService.peek_album_cover(music)
+        if cover is not None:
             self.music_cover.src_base64 = cover
             safe_update(self)
+            return
+
+        # Show the placeholder while the cover is read from the file
+        self.music_cover.src_base64 = None
+        self.music_cover.src = DEFAULT_PLACEHOLDER_IMAGE
+        safe_update(self)
+
+        if self.page:
+            self.page.run_thread(
+                self._load_music_cover, music, self._cover_generation
+            )
+
+    def _load_music_cover(self, music: Music, generation: int):
+        """Load a music cover off the UI thread, unless the track changed"""
+        try:
+            cover = MetadataService.load_album_cover(music)
+            if generation != self._cover_generation:
+                return
+
+            self.music_cover.src_base64 = cover
+            safe_update(self.music_cover)
         except Exception as err:
             print(f'Error updating music cover: {err}')
-            self.music_cover.src = DEFAULT_PLACEHOLDER_IMAGE
-            safe_update(self)
+
+    def _preload_next_cover(self):
+        """Load the cover of the next track in the background to cache it"""
+        if not self.page:
+            return
+
+        try:
+            next_music = self.audio_service.peek_next()
+            if next_music:
+                self.page.run_thread(
+                    MetadataService.load_album_cover,
+                    Music.from_dict(next_music)
+                )
+        except Exception as err:
+            print(f'Error preloading next cover: {err}')
 
     def _update_shuffle_state(self):
         """Update the shuffle button state"""
@@ -371,12 +429,9 @@ class PlayerBar(Container):
 
     def _get_volume_icon(self, volume: float, is_muted: bool):
         """Get the volume icon based on volume level and mute state"""
-        if is_muted or volume == 0:
+        if is_muted:
             return Icons.VOLUME_OFF
-        elif volume <= 0.44:
-            return Icons.VOLUME_DOWN
-        else:
-            return Icons.VOLUME_UP
+        return next(icon for bound, icon in _VOLUME_ICONS if volume <= bound)
 
     def _toggle_mute(self):
         """Toggle the mute state"""
@@ -385,23 +440,51 @@ class PlayerBar(Container):
         self.volume_slider.value = 0 if self._is_muted else self._volume
         safe_update(self)
 
+    def _preview_volume(self, new_volume: float):
+        """
+        Apply the volume while the slider is dragged, leaving the UI and
+        database for the drag end
+        """
+        self.audio_service.set_volume(new_volume, persist=False)
+
     def _set_volume(self, new_volume: float):
         """Set the volume level"""
         self._volume = new_volume
         self._is_muted = new_volume == 0
         self.audio_service.set_volume(new_volume)
-        self.button_volume.icon = self._get_volume_icon(new_volume, self._is_muted)
-        safe_update(self.page)
+
+        # The slider already shows the new value, only the icon may need
+        # redrawing
+        icon = self._get_volume_icon(new_volume, self._is_muted)
+        if icon == self.button_volume.icon:
+            return
+
+        self.button_volume.icon = icon
+        safe_update(self.button_volume)
 
     def on_position_changed(self, position, duration):
         """Handle audio position change events"""
-        self._update_current_time(position)
-        self._update_end_time(position, duration)
-        self._update_progress_time(position, duration)
+        # The displayed times only have second resolution, skip sub-second ticks
+        second = int(position // 1000)
+        if second == self._last_second:
+            return
+        self._last_second = second
+
+        with batch_updates(self):
+            self._update_duration(duration)
+            self._update_current_time(position)
+            self._update_end_time(position)
+            self._update_progress_time(position)
 
     def on_progress_time_seek(self, e: ControlEvent):
         """Handle end of progress time seek event"""
-        self.audio_service.seek(int(float(e.data)))
+        position = int(float(e.data))
+        self.audio_service.seek(position)
+
+        # Redraw right away, a paused player sends no position events
+        self._last_second = -1
+        self.on_position_changed(position, self._duration)
+
         if self._was_playing:
             self.audio_service.resume()
 
@@ -451,20 +534,35 @@ class PlayerBar(Container):
                 return
 
             # Remove all playlist items from the removed folder
-            original_len = len(player_state.playlist)
-            player_state.playlist = [
+            kept = [
                 music for music in player_state.playlist
                 if music.get('folder') != folder_path
             ]
-            player_state.played_music = [
-                music for music in player_state.played_music
-                if music.get('folder') != folder_path
-            ]
+            playlist_changed = len(kept) != len(player_state.playlist)
+
+            # Played tracks may come from an earlier playlist, so check their
+            # folder too
+            played_changed = any(
+                music.get('folder') == folder_path
+                for music in player_state.played_music
+            )
+
+            # Nothing references the folder, keep the state (and its cached
+            # JSON) as is
+            if not playlist_changed and not played_changed:
+                return
 
-            # Save changes to database if the playlist was updated
-            if len(player_state.playlist) != original_len:
-                self.player_repository.update_player_state(player_state)
-                self.player_state = player_state
+            if playlist_changed:
+                player_state.set_playlist(kept)
+            if played_changed:
+                player_state.reset_played(
+                    music for music in player_state.played_music
+                    if music.get('folder') != folder_path
+                )
+
+            # Save changes to database
+            self.player_repository.update_player_state(player_state)
+            self.player_state = player_state
 
         except Exception as err:
             import traceback
@@ -504,7 +602,7 @@ class PlayerBar(Container):
                 return
 
             # Update playlist
-            player_state.playlist = updated_playlist
+            player_state.set_playlist(updated_playlist)
 
             # Save changes to database
             self.player_repository.update_player_state(player_state)
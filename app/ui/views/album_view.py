@@ -175,8 +175,8 @@ class AlbumView(Container):
 
         # Set up playlist from album tracks and play first track
         all_tracks = [t.to_dict() for t in self.album.tracks]
-        player_state.playlist = all_tracks
-        player_state.playlist_source = "album"  # Mark that we're playing a specific album
+        # Mark that we're playing a specific album
+        player_state.set_playlist(all_tracks, source="album")
         self.audio_service.player_repository.update_player_state(player_state)
         self.audio_service.load_music(music_to_play)
         self.audio_service.play()
@@ -190,15 +190,14 @@ class AlbumView(Container):
         # If player is inactive, play immediately
         if not player_state.is_playing and not player_state.playlist:
             # Start playing this album
-            player_state.playlist = tracks_to_add
-            player_state.playlist_source = "album"
+            player_state.set_playlist(tracks_to_add, source="album")
             self.audio_service.player_repository.update_player_state(player_state)
             self.audio_service.load_music(self.album.tracks[0])
             self.audio_service.play()
             return
 
         # Otherwise, just append to the existing queue
-        player_state.playlist.extend(tracks_to_add)
+        player_state.extend_playlist(tracks_to_add)
         self.audio_service.player_repository.update_player_state(player_state)
         self.page.update()
 
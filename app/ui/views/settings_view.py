@@ -339,17 +339,14 @@ class SettingsView(AlertDialog):
             folder_music = self.music_repository.get_music_by_folder_path(folder.path, sort_by='album')
 
             if folder_music:
-                # Delete music tracks in batches for better performance
-                music_filenames = [music.filename for music in folder_music]
-                total_tracks = len(music_filenames)
-
-                # Process music deletion in batches
-                for i in range(0, total_tracks, DEFAULT_BATCH_SIZE):
-                    music_batch = music_filenames[i:i + DEFAULT_BATCH_SIZE]
-                    self.music_repository.batch_delete_music(music_batch)
+                # Delete the folder's music tracks with a single indexed
+                # statement
+                self.music_repository.delete_music_by_folder(folder.path)
 
                 # Get all unique album IDs from the music in this folder for batch deletion
-                album_names = [music.album for music in folder_music if music.album]
+                album_names = list(dict.fromkeys(
+                    music.album for music in folder_music if music.album
+                ))
                 total_albums = len(album_names)
 
                 # Process album deletion in batches if there are any albums
@@ -391,12 +388,9 @@ class SettingsView(AlertDialog):
                     return
 
                 # Process music files - save only new ones
-                all_files = self.music_repository.get_all_music(use_cache=True)
-                existing_filenames = {music.filename for music in all_files}
-
-                # Filter new files using set for O(1) lookups
-                new_music_files = [music for music in music_files
-                                  if music.filename not in existing_filenames]
+                new_music_files = self.music_repository.filter_new_music(
+                    music_files
+                )
 
                 # Save new music files and albums in batches
                 if new_music_files:
@@ -1,8 +1,13 @@
 from app.core.models import Album, Music
+from contextlib import contextmanager
 from re import match
-from typing import List, Optional, Any
+from threading import local
+from typing import Iterator, List, Optional, Any
 from unicodedata import combining, normalize
 
+# Per-thread nesting depth of batch_updates() blocks
+_batch_state = local()
+
 def normalize_str(value: str) -> str:
     """
     Normalize a string by removing accents and special characters
@@ -56,8 +61,34 @@ def safe_update(control: Optional[Any] = None):
     if control is None:
         return
 
+    # Inside a batch_updates() block the outer control is flushed on exit
+    if getattr(_batch_state, 'depth', 0):
+        return
+
     try:
         control.update()
     except AssertionError:
         # Skip update if component is not fully initialized
         pass
+
+@contextmanager
+def batch_updates(control: Optional[Any] = None) -> Iterator[None]:
+    """
+    Coalesce safe_update calls made inside the block into a single update
+
+    Every safe_update issued by the current thread while the block is active
+    is skipped, and the given control is updated once when the outermost
+    block exits. The control must be an ancestor of everything mutated in
+    the block (usually the page or the component itself).
+
+    Args:
+        control: The control to update on exit, if None nothing is flushed
+    """
+    depth = getattr(_batch_state, 'depth', 0)
+    _batch_state.depth = depth + 1
+    try:
+        yield
+    finally:
+        _batch_state.depth = depth
+        if depth == 0:
+            safe_update(control)
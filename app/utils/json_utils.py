@@ -0,0 +1,54 @@
+"""
+JSON serialization utilities
+"""
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional speedup
+    orjson = None
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers can
+# catch this single type whichever backend is active
+JSONDecodeError = json.JSONDecodeError
+
+
+def json_dumps(obj: Any) -> str:
+    """
+    Serialize an object to a JSON string
+
+    Uses orjson when it is installed, falling back to the standard library.
+
+    Args:
+        obj (Any): The object to serialize
+
+    Returns:
+        str: The JSON string
+
+    Raises:
+        TypeError: If the object is not serializable
+    """
+    if orjson is not None:
+        return orjson.dumps(obj).decode('utf-8')
+    return json.dumps(obj)
+
+
+def json_loads(value: str | bytes) -> Any:
+    """
+    Deserialize a JSON string
+
+    Uses orjson when it is installed, falling back to the standard library.
+
+    Args:
+        value (str | bytes): The JSON document
+
+    Returns:
+        Any: The deserialized object
+
+    Raises:
+        JSONDecodeError: If the value is not valid JSON
+    """
+    if orjson is not None:
+        return orjson.loads(value)
+    return json.loads(value)
@@ -1,19 +1,40 @@
 """
 Time formatting utilities
 """
+from functools import lru_cache
+
 from app.config.settings import DEFAULT_DURATION_TEXT
 
 
+@lru_cache(maxsize=4096)
+def _format_seconds(seconds_total: int) -> str:
+    """
+    Format a whole number of seconds to mm:ss format, or h:mm:ss from an hour on
+
+    Args:
+        seconds_total (int): Time in whole seconds
+
+    Returns:
+        str: Formatted time string in mm:ss or h:mm:ss format
+    """
+    hours, remainder = divmod(seconds_total, 3600)
+    minutes, seconds = divmod(remainder, 60)
+
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes:02d}:{seconds:02d}"
+
+
 def format_time(milliseconds: int, is_in_seconds=False) -> str:
     """
-    Format milliseconds to mm:ss format
+    Format milliseconds to mm:ss format, or h:mm:ss from an hour on
 
     Args:
         milliseconds (int or float): Time in milliseconds or seconds
         is_in_seconds (bool): If True, milliseconds are treated as seconds
 
     Returns:
-        str: Formatted time string in mm:ss format
+        str: Formatted time string in mm:ss or h:mm:ss format
     """
     if milliseconds is None:
         return DEFAULT_DURATION_TEXT
@@ -24,20 +45,16 @@ def format_time(milliseconds: int, is_in_seconds=False) -> str:
     # Convert milliseconds to seconds
     seconds_total = int(milliseconds // 1000) if not is_in_seconds else int(milliseconds)
 
-    # Calculate minutes and remaining seconds
-    minutes = seconds_total // 60
-    seconds = seconds_total % 60
-
-    # Format as mm:ss
-    return f"{minutes:02d}:{seconds:02d}"
+    # Inputs only have second resolution, so the formatted strings are memoized
+    return _format_seconds(seconds_total)
 
 
 def parse_time(time_str: str) -> int:
     """
-    Parse time string in mm:ss format to milliseconds
+    Parse time string in mm:ss or h:mm:ss format to milliseconds
 
     Args:
-        time_str (str): Time string in mm:ss format
+        time_str (str): Time string in mm:ss or h:mm:ss format
 
     Returns:
         int: Time in milliseconds
@@ -46,15 +63,18 @@ def parse_time(time_str: str) -> int:
         return 0
 
     try:
-        # Split into minutes and seconds
+        # Split into hours, minutes and seconds
         parts = time_str.split(":")
-        if len(parts) != 2:
+        if len(parts) == 2:
+            hours = 0
+            minutes, seconds = int(parts[0]), int(parts[1])
+        elif len(parts) == 3:
+            hours = int(parts[0])
+            minutes, seconds = int(parts[1]), int(parts[2])
+        else:
             return 0
 
-        minutes = int(parts[0])
-        seconds = int(parts[1])
-
         # Convert to milliseconds
-        return (minutes * 60 + seconds) * 1000
+        return (hours * 3600 + minutes * 60 + seconds) * 1000
     except ValueError:
         return 0
@@ -1,9 +1,13 @@
 """
 Plaii Music Player - Main Application Entry Point
 """
+from multiprocessing import freeze_support
+
 from flet import app
 
 from app.ui.app import AppWindow
 
 if __name__ == '__main__':
+    # Metadata worker processes re-enter here when the app is packaged
+    freeze_support()
     app(target=AppWindow)
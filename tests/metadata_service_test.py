@@ -0,0 +1,93 @@
+import os
+from collections import OrderedDict
+
+import pytest
+
+pytest.importorskip('tinytag')
+
+import app.services.metadata_service as metadata_module  # noqa: E402
+from app.services.metadata_service import MetadataService  # noqa: E402
+
+
+@pytest.fixture
+def parsed(monkeypatch):
+    """Start with an empty memo and record the files whose tags are parsed"""
+    files = []
+
+    def read_tags(file, with_image=False):
+        files.append(file)
+        return {'title': os.path.basename(file), 'filename': file}
+
+    monkeypatch.setattr(MetadataService, '_metadata_cache', OrderedDict())
+    monkeypatch.setattr(MetadataService, '_read_tags', staticmethod(read_tags))
+    return files
+
+
+def music_file(tmp_path, name, content=b'audio'):
+    path = tmp_path / f'{name}.mp3'
+    path.write_bytes(content)
+    return str(path)
+
+
+def test_unchanged_file_is_not_parsed_again(tmp_path, parsed):
+    file = music_file(tmp_path, 'a')
+
+    first = MetadataService.load_music_metadata(file)
+    second = MetadataService.load_music_metadata(file)
+
+    assert second is first
+    assert parsed == [file]
+
+
+def test_changed_mtime_parses_the_file_again(tmp_path, parsed):
+    file = music_file(tmp_path, 'a')
+    MetadataService.load_music_metadata(file)
+
+    stat = os.stat(file)
+    os.utime(file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    MetadataService.load_music_metadata(file)
+
+    assert parsed == [file, file]
+    # The new version replaces the entry of the old one
+    assert list(MetadataService._metadata_cache) == [file]
+
+
+def test_changed_size_parses_the_file_again(tmp_path, parsed):
+    file = music_file(tmp_path, 'a')
+    MetadataService.load_music_metadata(file)
+
+    # Same modification time, different size
+    stat = os.stat(file)
+    with open(file, 'ab') as audio:
+        audio.write(b'more')
+    os.utime(file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    MetadataService.load_music_metadata(file)
+
+    assert parsed == [file, file]
+
+
+def test_memo_drops_the_least_recently_used_file(tmp_path, parsed, monkeypatch):
+    monkeypatch.setattr(metadata_module, 'DEFAULT_METADATA_CACHE_SIZE', 2)
+    a, b, c = (music_file(tmp_path, name) for name in 'abc')
+
+    MetadataService.load_music_metadata(a)
+    MetadataService.load_music_metadata(b)
+    # Reading a again makes b the least recently used
+    MetadataService.load_music_metadata(a)
+    MetadataService.load_music_metadata(c)
+
+    assert list(MetadataService._metadata_cache) == [a, c]
+
+    MetadataService.load_music_metadata(a)
+    MetadataService.load_music_metadata(b)
+    assert parsed == [a, b, c, b]
+
+
+def test_metadata_with_image_is_not_memoized(tmp_path, parsed):
+    file = music_file(tmp_path, 'a')
+
+    MetadataService.load_music_metadata(file, with_image=True)
+    MetadataService.load_music_metadata(file, with_image=True)
+
+    assert parsed == [file, file]
+    assert not MetadataService._metadata_cache
@@ -0,0 +1,147 @@
+import app.core.models.player_state as player_state_module
+from app.core.models import PlayerState
+from app.utils.json_utils import json_dumps, json_loads
+
+
+def track(name):
+    return {'filename': f'/music/{name}.mp3', 'title': name.upper()}
+
+
+def filenames(tracks):
+    return [music['filename'] for music in tracks]
+
+
+def small_history(monkeypatch, size=3):
+    monkeypatch.setattr(player_state_module, 'MAX_PLAYED_HISTORY', size)
+    return PlayerState()
+
+
+def test_played_history_drops_the_oldest_track(monkeypatch):
+    state = small_history(monkeypatch)
+    a, b, c, d = (track(name) for name in 'abcd')
+
+    for music in (a, b, c):
+        state.add_played(music)
+    # Build the JSON of the saved entries before the eviction
+    state.to_dict()
+    state.add_played(d)
+
+    assert filenames(state.played_music) == filenames([b, c, d])
+    assert state.played_index(a['filename']) is None
+    assert state.played_index(b['filename']) == 0
+    assert state.played_index(d['filename']) == 2
+    assert json_loads(state.to_dict()['played_music']) == filenames([b, c, d])
+
+
+def test_played_history_adds_an_evicted_track_again(monkeypatch):
+    state = small_history(monkeypatch)
+    a, b, c, d = (track(name) for name in 'abcd')
+
+    for music in (a, b, c, d):
+        state.add_played(music)
+    state.add_played(a)
+    # Already in the history, not added twice
+    state.add_played(d)
+
+    assert filenames(state.played_music) == filenames([c, d, a])
+    assert state.played_index(b['filename']) is None
+    assert state.played_index(c['filename']) == 0
+    assert state.played_index(a['filename']) == 2
+    assert json_loads(state.to_dict()['played_music']) == filenames([c, d, a])
+
+
+def test_reset_played_replaces_the_history():
+    state = PlayerState()
+    a, b = track('a'), track('b')
+    state.add_played(a)
+    state.to_dict()
+
+    state.reset_played([b])
+
+    assert state.played_index(a['filename']) is None
+    assert state.played_index(b['filename']) == 0
+    assert json_loads(state.to_dict()['played_music']) == [b['filename']]
+
+
+def test_playlist_neighbour_of_a_removed_track():
+    a, c, e = track('a'), track('c'), track('e')
+    state = PlayerState()
+    state.set_playlist([e, a, c])
+
+    removed = track('d')['filename']
+    assert state.playlist_neighbour(removed, True) is e
+    assert state.playlist_neighbour(removed, False) is c
+
+    # Wraps around past either end of the playlist
+    assert state.playlist_neighbour(track('f')['filename'], True) is e
+    assert state.playlist_neighbour(track('0')['filename'], False) is c
+
+    state.set_playlist([])
+    assert state.playlist_neighbour(removed, True) is None
+
+
+def test_next_unplayed_walks_the_playlist_without_repeats():
+    playlist = [track(name) for name in 'abcdefgh']
+    state = PlayerState()
+    state.set_playlist(playlist)
+    state.add_played(playlist[0])
+
+    picked = []
+    music = state.next_unplayed()
+    while music is not None:
+        picked.append(music['filename'])
+        state.add_played(music)
+        music = state.next_unplayed()
+
+    assert sorted(picked) == filenames(playlist[1:])
+
+    # A new history shuffles a new order over the whole playlist
+    state.reset_played()
+    assert state.next_unplayed() in playlist
+
+
+def test_to_dict_from_dict_round_trip():
+    library = {music['filename']: music for music in map(track, 'abcd')}
+    playlist = [library['/music/b.mp3'], library['/music/a.mp3']]
+    played = [library['/music/c.mp3'], library['/music/a.mp3']]
+
+    state = PlayerState(
+        is_paused=False,
+        is_playing=True,
+        is_shuffle=True,
+        is_repeat='all',
+        volume=0.8,
+        audio_duration=180_000,
+        audio_position=42_000,
+        current_music=library['/music/a.mp3'],
+        current_album='Album',
+        playlist=playlist,
+        playlist_source='album',
+        played_music=played,
+    )
+
+    data = state.to_dict()
+    assert json_loads(data['playlist']) == filenames(playlist)
+    assert json_loads(data['played_music']) == filenames(played)
+
+    restored = PlayerState.from_dict(data, resolve=library.get)
+
+    assert restored == state
+    assert restored.played_index('/music/a.mp3') == 1
+
+
+def test_from_dict_reads_legacy_track_lists():
+    a, b = track('a'), track('b')
+    library = {a['filename']: a}
+    data = {
+        # Older versions stored full tracks instead of filenames
+        'playlist': json_dumps([a, b]),
+        # Filenames no longer in the library are dropped
+        'played_music': json_dumps([a['filename'], '/music/gone.mp3', b]),
+    }
+
+    restored = PlayerState.from_dict(data, resolve=library.get)
+
+    assert restored.playlist == [a, b]
+    assert list(restored.played_music) == [a, b]
+    assert restored.played_index(b['filename']) == 1
@@ -0,0 +1,104 @@
+import pytest
+
+import app.data.datastore as datastore_module
+from app.core.models import Album, Music
+from app.data.datastore import ConnectionPool, Datastore
+from app.data.repositories import AlbumRepository, MusicRepository
+
+
+@pytest.fixture(autouse=True)
+def database(tmp_path, monkeypatch):
+    # Every test gets its own database file and connection pool
+    monkeypatch.setattr(datastore_module, 'DB_PATH', str(tmp_path / 'test.db'))
+    monkeypatch.setattr(ConnectionPool, '_instance', None)
+    monkeypatch.setattr(Datastore, '_initialized_schema', set())
+    yield
+    ConnectionPool().close_all()
+
+
+def music(name, title=None, album='Album'):
+    return Music(
+        title=title or name.upper(),
+        artist='Artist',
+        album=album,
+        album_artist='Artist',
+        filename=f'/music/{name}.mp3',
+        duration='03:00',
+        folder='/music',
+    )
+
+
+def test_save_many_inserts_and_updates_on_conflict():
+    datastore = Datastore('items')
+    datastore.create_table(columns={
+        'id': 'INTEGER PRIMARY KEY AUTOINCREMENT',
+        'key': 'TEXT UNIQUE',
+        'value': 'TEXT',
+    })
+
+    datastore.save_many([
+        {'key': 'a', 'value': '1'},
+        {'key': 'b', 'value': '2'},
+    ], conflict_columns=['key'])
+    datastore.save_many([
+        {'key': 'b', 'value': '3'},
+        {'key': 'c', 'value': '4'},
+    ], conflict_columns=['key'])
+
+    rows = datastore.list(column='key, value')
+    assert sorted((row['key'], row['value']) for row in rows) == [
+        ('a', '1'), ('b', '3'), ('c', '4')
+    ]
+    assert datastore.save_many([]) == 0
+
+
+def test_batch_save_music_updates_tracks_already_saved():
+    repository = MusicRepository()
+
+    assert repository.batch_save_music([music('a'), music('b')])
+    assert repository.batch_save_music([
+        music('b', title='Retagged'), music('c')
+    ])
+
+    saved = repository.get_all_music(use_cache=False)
+    assert sorted((track.filename, track.title) for track in saved) == [
+        ('/music/a.mp3', 'A'),
+        ('/music/b.mp3', 'Retagged'),
+        ('/music/c.mp3', 'C'),
+    ]
+
+
+def test_batch_save_albums_inserts_and_merges():
+    repository = AlbumRepository()
+    first = Album(name='First', artist='Artist', year=2001,
+                  tracks=[music('a', album='First')])
+    second = Album(name='Second', artist='Artist', cover='cover-2',
+                   tracks=[music('b', album='Second')])
+
+    # New albums are inserted with a single executemany
+    assert repository.batch_save_albums([first, second])
+
+    # A later scan adds tracks and fills in a missing cover
+    first_again = Album(name='First', artist='Artist', year=1999,
+                        cover='cover-1', tracks=[music('c', album='First')])
+    second_again = Album(name='Second', artist='Artist', cover='other',
+                         tracks=[music('b', album='Second')])
+    assert repository.batch_save_albums([first_again, second_again])
+
+    albums = {
+        album.name: album
+        for album in repository.get_all_albums(use_cache=False)
+    }
+    assert sorted(albums) == ['First', 'Second']
+    assert [track.filename for track in albums['First'].tracks] == [
+        '/music/a.mp3', '/music/c.mp3'
+    ]
+    assert albums['First'].year == 2001
+    assert albums['First'].cover == 'cover-1'
+    assert [track.filename for track in albums['Second'].tracks] == [
+        '/music/b.mp3'
+    ]
+    assert albums['Second'].cover == 'cover-2'
+    assert repository.get_album_keys_with_cover() == {
+        'First:Artist', 'Second:Artist'
+    }
@@ -0,0 +1,33 @@
+from app.utils.time_format import format_time, parse_time
+
+
+def test_format_time_below_an_hour():
+    assert format_time(0) == '00:00'
+    assert format_time(59_999) == '00:59'
+    assert format_time(3_599_000) == '59:59'
+    assert format_time(3_599, is_in_seconds=True) == '59:59'
+
+
+def test_format_time_from_an_hour_on():
+    assert format_time(3_600_000) == '1:00:00'
+    assert format_time(3_600, is_in_seconds=True) == '1:00:00'
+    assert format_time(36_061_000) == '10:01:01'
+
+
+def test_format_time_without_duration():
+    assert format_time(None) == '00:00'
+
+
+def test_parse_time():
+    assert parse_time('59:59') == 3_599_000
+    assert parse_time('1:00:00') == 3_600_000
+    assert parse_time('') == 0
+    assert parse_time('90') == 0
+    assert parse_time('1:2:3:4') == 0
+    assert parse_time('a:b') == 0
+
+
+def test_parse_time_round_trip():
+    for seconds in (0, 59, 60, 3_599, 3_600, 3_661, 36_000):
+        milliseconds = seconds * 1000
+        assert parse_time(format_time(milliseconds)) == milliseconds